@@ -13,9 +13,34 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from src.pipeline import EnterpriseNewsPipeline
+from src.crawlers import close_session
 from src.models import model_manager
 from src.utils import setup_logging, print_system_status
 
+# Prefer the libuv-based event loop where it is available
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+# Upper bound on concurrent queries so the crawlers aren't overwhelmed
+MAX_CONCURRENT_QUERIES = 8
+
+# One pipeline (and its crawler sessions and caches) shared by every example
+pipeline = EnterpriseNewsPipeline()
+
+
+async def gather_queries(pipeline: EnterpriseNewsPipeline, queries: list) -> list:
+    """Run several enterprise queries concurrently so their generations can be batched."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_QUERIES)
+    
+    async def run(kwargs: dict) -> str:
+        async with semaphore:
+            return await pipeline.process_enterprise_query(**kwargs)
+    
+    return await asyncio.gather(*(run(kwargs) for kwargs in queries))
+
 
 async def basic_news_query():
     """Demonstrate basic news query functionality."""
@@ -23,9 +48,6 @@ async def basic_news_query():
     print("🔍 Basic News Query Example")
     print("=" * 50)
     
-    # Initialize the pipeline
-    pipeline = EnterpriseNewsPipeline()
-    
     # Example 1: Simple company news query
     print("\n1. Simple Company News Query:")
     print("-" * 30)
@@ -47,15 +69,19 @@ async def basic_news_query():
     
     styles = ["professional", "casual", "executive", "technical"]
     
-    for style in styles:
-        print(f"\nStyle: {style}")
-        result = await pipeline.process_enterprise_query(
+    results = await gather_queries(pipeline, [
+        dict(
             user_input="Tell me about Apple's recent developments",
             company="Apple",
             style=style,
             time_range="6 hours",
             impact_threshold=4.0
         )
+        for style in styles
+    ])
+    
+    for style, result in zip(styles, results):
+        print(f"\nStyle: {style}")
         print(f"Response: {result[:150]}...")
 
 
@@ -65,8 +91,6 @@ async def advanced_features():
     print("\n🔧 Advanced Features Example")
     print("=" * 50)
     
-    pipeline = EnterpriseNewsPipeline()
-    
     # Example 3: Company name extraction
     print("\n3. Company Name Extraction:")
     print("-" * 30)
@@ -77,14 +101,18 @@ async def advanced_features():
         "Tell me about Amazon's earnings"
     ]
     
-    for query in queries:
-        result = await pipeline.process_enterprise_query(
+    results = await gather_queries(pipeline, [
+        dict(
             user_input=query,
             company=None,  # Let the system extract company name
             style="professional",
             time_range="24 hours",
             impact_threshold=5.0
         )
+        for query in queries
+    ])
+    
+    for query, result in zip(queries, results):
         print(f"Query: {query}")
         print(f"Response: {result[:100]}...")
     
@@ -94,15 +122,19 @@ async def advanced_features():
     
     time_ranges = ["1 hour", "6 hours", "24 hours"]
     
-    for time_range in time_ranges:
-        print(f"\nTime Range: {time_range}")
-        result = await pipeline.process_enterprise_query(
+    results = await gather_queries(pipeline, [
+        dict(
             user_input="What's the latest on Tesla?",
             company="Tesla",
             style="professional",
             time_range=time_range,
             impact_threshold=5.0
         )
+        for time_range in time_ranges
+    ])
+    
+    for time_range, result in zip(time_ranges, results):
+        print(f"\nTime Range: {time_range}")
         print(f"Response: {result[:100]}...")
 
 
@@ -112,7 +144,6 @@ async def session_management():
     print("\n📊 Session Management Example")
     print("=" * 50)
     
-    pipeline = EnterpriseNewsPipeline()
     session_id = "example_session_123"
     
     # Example 5: Session-based queries
@@ -150,8 +181,6 @@ async def error_handling():
     print("\n⚠️ Error Handling Example")
     print("=" * 50)
     
-    pipeline = EnterpriseNewsPipeline()
-    
     # Example 6: Invalid company name
     print("\n6. Invalid Company Name:")
     print("-" * 30)
@@ -189,8 +218,6 @@ async def performance_monitoring():
     print("\n⚡ Performance Monitoring Example")
     print("=" * 50)
     
-    pipeline = EnterpriseNewsPipeline()
-    
     # Example 8: Performance tracking
     print("\n8. Performance Tracking:")
     print("-" * 30)
@@ -251,6 +278,9 @@ async def main():
     except Exception as e:
         print(f"❌ Error running examples: {e}")
         logger.error(f"Example error: {e}")
+    
+    finally:
+        await close_session()
 
 
 if __name__ == "__main__":
@@ -13,13 +13,30 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.models import model_manager
-from src.interface import interface
-from src.utils import setup_logging, print_system_status, validate_environment
+# The platform modules (torch, transformers, spaCy) are imported inside the entry points:
+# spawned worker processes re-import this script and must not load them.
+
+# Prefer the libuv-based event loop where it is available
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+
+def run_async(coro):
+    """Run a coroutine to completion on a single long-lived event loop."""
+    if hasattr(asyncio, "Runner"):  # Python 3.11+
+        with asyncio.Runner() as runner:
+            return runner.run(coro)
+    return asyncio.run(coro)
 
 
 async def main():
     """Main application entry point."""
+    from src.models import model_manager
+    from src.interface import interface
+    from src.utils import setup_logging, print_system_status, validate_environment
     
     print("🚀 Starting RAP IQ - AI News Intelligence Platform...")
     
@@ -43,18 +60,14 @@ async def main():
         print("Please install spaCy model: python -m spacy download en_core_web_sm")
         return False
     
-    # Load models
-    print("🔄 Loading AI models...")
-    if not model_manager.load_models():
-        print("❌ Failed to load models")
-        return False
+    # Load models in the background; generation waits for them on first use
+    print("🔄 Loading AI models in the background...")
+    model_manager.start_background_load()
     
     # Print model info
     model_info = model_manager.get_model_info()
-    print(f"✅ Models loaded successfully!")
     print(f"   Device: {model_info['device']}")
     print(f"   Model: {model_info['model_name']}")
-    print(f"   Parameters: {model_info.get('model_parameters', 'Unknown'):,}")
     
     # Launch interface
     print("🎨 Launching web interface...")
@@ -119,12 +132,7 @@ def run_tests():
             return False
     
     # Run tests
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    result = loop.run_until_complete(test_pipeline())
-    loop.close()
-    
-    return result
+    return run_async(test_pipeline())
 
 
 if __name__ == "__main__":
@@ -136,6 +144,7 @@ if __name__ == "__main__":
             sys.exit(0 if success else 1)
         elif sys.argv[1] == "status":
             # Show system status
+            from src.utils import print_system_status
             print_system_status()
             sys.exit(0)
         elif sys.argv[1] == "help":
@@ -158,10 +167,7 @@ Examples:
     
     # Run main application
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        success = loop.run_until_complete(main())
-        loop.close()
+        success = run_async(main())
         
         if not success:
             sys.exit(1)
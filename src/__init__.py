@@ -9,21 +9,46 @@ __version__ = "1.0.0"
 __author__ = "RAP IQ Team"
 __email__ = "support@rap-iq.com"
 
-from .config import Config
-from .models import ModelManager
-from .crawlers import NewsCrawler, DuckDuckGoCrawler, RSSCrawler
-from .ai import ConversationalAI, ResponseGenerator
-from .pipeline import NewsPipeline, EnterpriseNewsPipeline
-from .utils import setup_logging, validate_environment
+import importlib
+
+# Public name -> defining submodule. Exports are imported on first access, so importing a
+# lightweight submodule (e.g. the feed-parsing worker in spawned processes) doesn't pull in
+# torch, transformers and spaCy.
+_EXPORTS = {
+    'Config': '.config',
+    'ModelManager': '.models',
+    'DuckDuckGoCrawler': '.crawlers',
+    'RSSCrawler': '.crawlers',
+    'ConversationalAI': '.ai',
+    'ResponseGenerator': '.ai',
+    'SemanticResponseCache': '.ai',
+    'Style': '.ai',
+    'NewsPipeline': '.pipeline',
+    'EnterpriseNewsPipeline': '.pipeline',
+    'setup_logging': '.utils',
+    'validate_environment': '.utils'
+}
+
+
+def __getattr__(name):
+    """Import a public export from its submodule on first access."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'Config',
     'ModelManager', 
-    'NewsCrawler',
     'DuckDuckGoCrawler',
     'RSSCrawler',
     'ConversationalAI',
     'ResponseGenerator',
+    'SemanticResponseCache',
+    'Style',
     'NewsPipeline',
     'EnterpriseNewsPipeline',
     'setup_logging',
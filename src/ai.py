@@ -2,26 +2,120 @@
 AI module for conversational AI and response generation.
 """
 
+import sys
 import torch
+import asyncio
+import hashlib
+import contextlib
+import itertools
+import numpy as np
+from cachetools import LRUCache
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass
 from datetime import datetime
-from typing import List, Dict, Optional
-from .models import model_manager
+from enum import IntEnum
+from types import MappingProxyType
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+from .models import model_manager, batch_scheduler
 from .config import config
 
 
+class Style(IntEnum):
+    """Conversational response styles."""
+    PROFESSIONAL = 0
+    CASUAL = 1
+    EXECUTIVE = 2
+    TECHNICAL = 3
+
+
+# System prompt per style, indexed by Style
+_STYLE_PROMPTS: Tuple[str, ...] = tuple(sys.intern(prompt) for prompt in (
+    "You are an expert financial news analyst. Provide detailed, professional insights.",
+    "You are a friendly news assistant. Explain things in a conversational, easy-to-understand way.",
+    "You are a senior business strategist. Focus on strategic implications and business impact.",
+    "You are a financial technology expert. Provide in-depth technical analysis."
+))
+
+# Fixed prompt prefix (header + system prompt) per style, indexed by Style; it ends before the
+# blank line so its last token can't merge with the rest of the prompt
+_STYLE_PREFIXES: Tuple[str, ...] = tuple(sys.intern(f"<s>[INST] {prompt}") for prompt in _STYLE_PROMPTS)
+
+# Prefill their KV state while the models load rather than alongside live requests
+model_manager.register_warm_prefixes(_STYLE_PREFIXES)
+
+# Typical response length in tokens per style, indexed by Style; used to bin batched generations
+_STYLE_OUTPUT_TOKENS: Tuple[int, ...] = (150, 80, 200, 200)
+
+_STYLES_BY_NAME = MappingProxyType({style.name.lower(): style for style in Style})
+
+# Summary prompt per UI style label
+_SUMMARY_STYLE_PROMPTS = MappingProxyType({label: sys.intern(prompt) for label, prompt in {
+    "📊 Formal business summary": "Provide a formal, professional business summary of the following news:",
+    "💬 Casual conversation": "Give me a casual, friendly summary of this news like you're talking to a friend:",
+    "📋 Quick bullet points": "Summarize this news in concise bullet points:",
+    "📈 Executive briefing": "Create an executive briefing focusing on business impact:",
+    "🔍 Technical analysis": "Provide a detailed technical analysis of the news:"
+}.items()})
+
+_DEFAULT_SUMMARY_PROMPT = _SUMMARY_STYLE_PROMPTS["📊 Formal business summary"]
+
+_SUMMARY_INSTRUCTION = sys.intern("""
+
+Please provide a comprehensive summary with source links included. Do not answer any other queries that are not related to company news or company live events.
+""")
+
+
+def annotate_news_items(news_items: Optional[List[Dict]]) -> Optional[List[Dict]]:
+    """Precompute the display strings shared by every formatter; safe to call more than once."""
+    for item in news_items or ():
+        if '_link_line' not in item:
+            item['_link_line'] = f"[{item['title'][:70]}...]({item['url']}) - Impact: {item.get('impact_score', 5):.1f}/10"
+        if '_snippet' not in item:
+            # The prompt quotes 150 characters and the fallback response 200; both slice this
+            item['_snippet'] = item.get('snippet', item.get('content', ''))[:200]
+    return news_items
+
+
+def resolve_style(style: Union[Style, str]) -> Style:
+    """Map a style name to its Style, defaulting to professional for unknown names."""
+    if isinstance(style, Style):
+        return style
+    return _STYLES_BY_NAME.get(style, Style.PROFESSIONAL)
+
+
+@dataclass
+class NewsBatch:
+    """Struct-of-arrays view of news items for vectorized scans."""
+    titles: np.ndarray
+    urls: np.ndarray
+    impact_scores: np.ndarray
+    content_types: np.ndarray
+    search_queries: np.ndarray
+    
+    @classmethod
+    def from_items(cls, news_items: List[Dict]) -> "NewsBatch":
+        """Convert the list-of-dicts news representation once."""
+        return cls(
+            titles=np.array([item.get('title', '') for item in news_items], dtype=object),
+            urls=np.array([item.get('url', '') for item in news_items], dtype=object),
+            impact_scores=np.array([item.get('impact_score', 5) for item in news_items], dtype=np.float32),
+            content_types=np.array([item.get('content_type', 'General') for item in news_items], dtype=object),
+            search_queries=np.array([item.get('search_query', '') for item in news_items], dtype=str)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.titles)
+
+
 class ResponseGenerator:
     """Generate styled responses using LLM."""
     
     def __init__(self, model, tokenizer):
         self.model = model
         self.tokenizer = tokenizer
-        self.style_prompts = {
-            "📊 Formal business summary": "Provide a formal, professional business summary of the following news:",
-            "💬 Casual conversation": "Give me a casual, friendly summary of this news like you're talking to a friend:",
-            "📋 Quick bullet points": "Summarize this news in concise bullet points:",
-            "📈 Executive briefing": "Create an executive briefing focusing on business impact:",
-            "🔍 Technical analysis": "Provide a detailed technical analysis of the news:"
-        }
+        self.style_prompts = _SUMMARY_STYLE_PROMPTS
+        # whole summary prompt -> token ids; repeat queries over the same cached news rebuild the same prompt
+        self._prompt_ids = LRUCache(maxsize=config.cache.prompt_ids_cache_size)
     
     def generate_summary(self, news_items: List[Dict], style: str, company: str) -> str:
         """Generate styled summary from news items."""
@@ -29,35 +123,43 @@ class ResponseGenerator:
         if not news_items:
             return f"No recent news found for {company}. Please try again or check the company name."
         
-        # Prepare context
-        news_context = self._prepare_news_context(news_items)
+        # Only the top 5 items are ever shown, so truncate once here
+        news_items = annotate_news_items(news_items[:5])
         
         # Get style prompt
-        style_prompt = self.style_prompts.get(style, self.style_prompts["📊 Formal business summary"])
+        style_prompt = self.style_prompts.get(style, _DEFAULT_SUMMARY_PROMPT)
         
-        # Create full prompt
-        full_prompt = f"""
-{style_prompt}
-
-Company: {company}
-News Updates:
-{news_context}
-
-Please provide a comprehensive summary with source links included. Do not answer any other queries that are not related to company news or company live events.
-"""
+        # Joined before tokenizing: BPE merges and leading-space handling can differ at fragment boundaries
+        prompt = "".join([
+            f"\n{style_prompt}\n\n",
+            f"Company: {company}\nNews Updates:\n",
+            *self._news_context_parts(news_items),
+            _SUMMARY_INSTRUCTION
+        ])
         
         try:
             # Generate response
-            inputs = self.tokenizer.encode(full_prompt, return_tensors='pt', truncation=True, max_length=512)
+            inputs = self._encode_prompt(prompt).to(self.model.device)
+            attention_mask = torch.ones_like(inputs)
             
-            with torch.no_grad():
+            # Speculative decoding: the draft model proposes tokens the main model verifies
+            assistant_kwargs = {}
+            if model_manager.draft_model is not None:
+                assistant_kwargs = {
+                    'assistant_model': model_manager.draft_model,
+                    'num_assistant_tokens': config.model.num_assistant_tokens
+                }
+            
+            with torch.inference_mode(), self._autocast():
                 outputs = self.model.generate(
                     inputs,
+                    attention_mask=attention_mask,
                     max_length=inputs.shape[1] + 150,
                     num_return_sequences=1,
                     temperature=0.7,
                     do_sample=True,
-                    pad_token_id=self.tokenizer.eos_token_id
+                    pad_token_id=self.tokenizer.eos_token_id,
+                    **assistant_kwargs
                 )
             
             response = self.tokenizer.decode(outputs[0][inputs.shape[1]:], skip_special_tokens=True)
@@ -71,103 +173,295 @@ Please provide a comprehensive summary with source links included. Do not answer
             # Fallback to template-based response
             return self._generate_template_response(news_items, style, company)
     
-    def _prepare_news_context(self, news_items: List[Dict]) -> str:
-        """Prepare news context for LLM."""
-        context = ""
-        for i, item in enumerate(news_items[:5], 1):  # Limit to top 5
-            context += f"""
+    def _encode_prompt(self, prompt: str) -> torch.Tensor:
+        """Token ids of the whole prompt, tokenized once per distinct prompt."""
+        input_ids = self._prompt_ids.get(prompt)
+        if input_ids is None:
+            input_ids = self.tokenizer(prompt, return_tensors='pt', max_length=512, truncation=True)['input_ids']
+            self._prompt_ids[prompt] = input_ids
+        return input_ids
+    
+    def _autocast(self):
+        """Run GPU generation in half precision; a no-op on CPU."""
+        if torch.cuda.is_available():
+            return torch.autocast(device_type='cuda', dtype=config.model.get_torch_dtype())
+        return contextlib.nullcontext()
+    
+    def _news_context_parts(self, news_items: List[Dict]) -> List[str]:
+        """Per-item news context fragments for the LLM prompt."""
+        return [f"""
 {i}. {item['title']}
    Source: {item['source']} | Impact: {item['impact_score']:.1f}/10
    URL: {item['url']}
-   """
-        return context
+   """ for i, item in enumerate(news_items, 1)]
+    
+    def _prepare_news_context(self, news_items: List[Dict]) -> str:
+        """Prepare news context for LLM."""
+        return "".join(self._news_context_parts(news_items))
     
     def _format_response(self, response: str, news_items: List[Dict], style: str) -> str:
         """Format the response with proper styling and links."""
         
         # Add news links at the end
-        links_section = "\n\n**📎 Source Links:**\n"
-        for i, item in enumerate(news_items[:5], 1):
-            links_section += f"{i}. [{item['title'][:60]}...]({item['url']})\n"
+        parts = [response, "\n\n**📎 Source Links:**\n"]
+        for i, item in enumerate(news_items, 1):
+            parts.append(f"{i}. {item['_link_line']}\n")
         
-        return response + links_section
+        return "".join(parts)
     
     def _generate_template_response(self, news_items: List[Dict], style: str, company: str) -> str:
         """Fallback template-based response."""
         
-        if "bullet points" in style.lower():
-            response = f"## 📋 Latest News for {company}:\n\n"
-            for item in news_items[:5]:
-                response += f"• **{item['title']}** (Impact: {item['impact_score']:.1f}/10)\n"
-                response += f"  *Source: {item['source']}* - [Read More]({item['url']})\n\n"
+        style_lower = style.lower()
+        
+        if "bullet points" in style_lower:
+            parts = [f"## 📋 Latest News for {company}:\n\n"]
+            for item in news_items:
+                parts.append(f"• **{item['title']}** (Impact: {item['impact_score']:.1f}/10)\n")
+                parts.append(f"  *Source: {item['source']}* - [Read More]({item['url']})\n\n")
         
-        elif "casual" in style.lower():
-            response = f"## 💬 Hey! Here's what's happening with {company}:\n\n"
-            for item in news_items[:3]:
-                response += f"**{item['title']}** - This seems pretty important (impact score: {item['impact_score']:.1f}/10). "
-                response += f"You can [check it out here]({item['url']}).\n\n"
+        elif "casual" in style_lower:
+            parts = [f"## 💬 Hey! Here's what's happening with {company}:\n\n"]
+            for item in itertools.islice(news_items, 3):
+                parts.append(f"**{item['title']}** - This seems pretty important (impact score: {item['impact_score']:.1f}/10). ")
+                parts.append(f"You can [check it out here]({item['url']}).\n\n")
         
         else:  # Formal
-            response = f"## 📊 Business Summary for {company}\n\n"
-            response += f"Based on recent news analysis, here are the key developments:\n\n"
-            for item in news_items[:5]:
-                response += f"**{item['title']}**\n"
-                response += f"Impact Assessment: {item['impact_score']:.1f}/10 | Source: {item['source']}\n"
-                response += f"[Full Article]({item['url']})\n\n"
+            parts = [
+                f"## 📊 Business Summary for {company}\n\n",
+                "Based on recent news analysis, here are the key developments:\n\n"
+            ]
+            for item in news_items:
+                parts.append(f"**{item['title']}**\n")
+                parts.append(f"Impact Assessment: {item['impact_score']:.1f}/10 | Source: {item['source']}\n")
+                parts.append(f"[Full Article]({item['url']})\n\n")
         
-        return response
+        return "".join(parts)
+
+
+class SemanticResponseCache:
+    """Reuse generated responses for near-identical questions about the same news."""
+    
+    def __init__(self, threshold: float = None, max_entries: int = None):
+        self.threshold = threshold or config.cache.similarity_threshold
+        self.max_entries = max_entries or config.cache.max_entries
+        self.hits = 0
+        self.misses = 0
+        
+        # (bucket, normalized query) -> (embedding, response), in LRU order
+        self._entries: "OrderedDict[Tuple[tuple, str], Tuple[Optional[np.ndarray], str]]" = OrderedDict()
+        # bucket -> {normalized query: embedding}, the per-bucket inner-product index
+        self._index: Dict[tuple, Dict[str, np.ndarray]] = {}
+        
+        # Exact-string fast path: repeated queries are never re-embedded
+        self._embeddings = LRUCache(maxsize=self.max_entries)
+    
+    def _embed(self, normalized: str) -> Optional[np.ndarray]:
+        """Embed a normalized query, memoizing real embeddings but not the None returned while no embedder is loaded."""
+        embedding = self._embeddings.get(normalized)
+        if embedding is None:
+            embedding = model_manager.embed_text(normalized)
+            if embedding is not None:
+                self._embeddings[normalized] = embedding
+        return embedding
+    
+    async def _embed_async(self, query: str, bucket_only: tuple = None):
+        """Embed a query in a worker thread so get()/put() find it memoized instead of embedding on the event loop.
+        
+        Only the model call runs in the thread; the memo is written back on the loop, like every other
+        cache structure. With ``bucket_only``, skips the work when that bucket has nothing to compare
+        against, as get() does.
+        """
+        if bucket_only is not None and not self._index.get(bucket_only):
+            return
+        
+        normalized = self._normalize(query)
+        if normalized in self._embeddings:
+            return
+        
+        embedding = await asyncio.to_thread(model_manager.embed_text, normalized)
+        if embedding is not None:
+            self._embeddings[normalized] = embedding
+    
+    async def get_async(self, query: str, company: Optional[str], style: str,
+                        news_data: Optional[List[Dict]], history: Sequence[Dict] = ()) -> Optional[str]:
+        """get(), with any embedding done off the event loop."""
+        await self._embed_async(query, bucket_only=self._bucket(company, style, news_data, history))
+        return self.get(query, company, style, news_data, history)
+    
+    async def put_async(self, query: str, company: Optional[str], style: str,
+                        news_data: Optional[List[Dict]], response: str, history: Sequence[Dict] = ()):
+        """put(), with the embedding done off the event loop."""
+        await self._embed_async(query)
+        self.put(query, company, style, news_data, response, history)
+    
+    @staticmethod
+    def _normalize(query: str) -> str:
+        """Normalize whitespace and case so trivial variations share a key."""
+        return " ".join(query.lower().split())
+    
+    @staticmethod
+    def _fingerprint(news_data: Optional[List[Dict]]) -> str:
+        """Hash the top news URLs so cached responses are only reused for the same news."""
+        urls = sorted(item.get('url', '') for item in (news_data or [])[:config.cache.fingerprint_items])
+        return hashlib.blake2b("\n".join(urls).encode(), digest_size=16).hexdigest()
+    
+    @staticmethod
+    def _history_digest(history: Sequence[Dict]) -> str:
+        """Hash the prior exchanges quoted in the prompt, so a follow-up never gets a first-turn answer."""
+        text = "\n".join(f"{exchange['user'][:100]}\n{exchange['assistant'][:100]}" for exchange in history)
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+    
+    def _bucket(self, company: Optional[str], style: str, news_data: Optional[List[Dict]],
+                history: Sequence[Dict] = ()) -> tuple:
+        """Entries are only comparable within the same company, style, news fingerprint and conversation history."""
+        return ((company or '').lower(), style, self._fingerprint(news_data), self._history_digest(history))
+    
+    def get(self, query: str, company: Optional[str], style: str, news_data: Optional[List[Dict]],
+            history: Sequence[Dict] = ()) -> Optional[str]:
+        """Return a cached response for a semantically equivalent query, if any."""
+        bucket = self._bucket(company, style, news_data, history)
+        normalized = self._normalize(query)
+        
+        key = (bucket, normalized)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][1]
+        
+        candidates = self._index.get(bucket)
+        embedding = self._embed(normalized) if candidates else None
+        if embedding is not None:
+            queries = list(candidates)
+            similarities = np.stack([candidates[q] for q in queries]) @ embedding
+            best = int(np.argmax(similarities))
+            
+            if similarities[best] >= self.threshold:
+                key = (bucket, queries[best])
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][1]
+        
+        self.misses += 1
+        return None
+    
+    def put(self, query: str, company: Optional[str], style: str, news_data: Optional[List[Dict]], response: str,
+            history: Sequence[Dict] = ()):
+        """Store a generated response, evicting the least recently used entry when full."""
+        bucket = self._bucket(company, style, news_data, history)
+        normalized = self._normalize(query)
+        embedding = self._embed(normalized)
+        
+        self._entries[(bucket, normalized)] = (embedding, response)
+        self._entries.move_to_end((bucket, normalized))
+        if embedding is not None:
+            self._index.setdefault(bucket, {})[normalized] = embedding
+        
+        while len(self._entries) > self.max_entries:
+            (old_bucket, old_query), _ = self._entries.popitem(last=False)
+            bucket_index = self._index.get(old_bucket)
+            if bucket_index is not None:
+                bucket_index.pop(old_query, None)
+                if not bucket_index:
+                    del self._index[old_bucket]
+    
+    def clear(self):
+        """Drop all cached responses."""
+        self._entries.clear()
+        self._index.clear()
+        self._embeddings.clear()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache hit/miss statistics."""
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
 
 
 class ConversationalAI:
     """Enterprise-level conversational AI with Mistral."""
     
     def __init__(self):
-        self.conversation_history = []
         self.user_preferences = {}
         self.context_window = config.model.context_window
+        self.conversation_history = deque(maxlen=self.context_window)
+        self.response_cache = SemanticResponseCache()
+        self._background_tasks = set()  # strong refs so pending tasks aren't garbage collected
     
-    def generate_conversational_response(self, user_input: str, news_data: List[Dict] = None, style: str = "professional") -> str:
+    def _style_prefix(self, style: Union[Style, str]) -> str:
+        """Get the fixed prompt prefix (header + system prompt) for a style."""
+        return _STYLE_PREFIXES[resolve_style(style)]
+    
+    async def generate_conversational_response(self, user_input: str, news_data: List[Dict] = None,
+                                               style: Union[Style, str] = "professional", company: str = None) -> str:
         """Generate conversational response with news context."""
         
+        style = resolve_style(style)
+        
+        # Prompts and source links only use the top 5 items; the expansion still scans them all
+        top_news = annotate_news_items(news_data[:5]) if news_data else news_data
+        
+        # The exchanges this prompt quotes, snapshotted so the cache key matches the prompt
+        history = self._recent_exchanges()
+        
+        # Serve near-identical questions about the same news from cache
+        cached_response = await self.response_cache.get_async(user_input, company, style, news_data, history)
+        if cached_response is not None:
+            self._record_exchange(user_input, cached_response, style)
+            return cached_response
+        
         # Build conversation context
-        context = self._build_conversation_context(user_input, news_data, style)
+        context = self._build_conversation_context(user_input, top_news, style, history)
         
         try:
-            # Use model manager to generate response
-            response = model_manager.generate_response(context, config.model.max_tokens)
+            # Batch with concurrent requests, reusing the style prefix KV state when alone
+            response = await batch_scheduler.submit(
+                context, config.model.max_tokens, prefix=self._style_prefix(style),
+                length_hint=_STYLE_OUTPUT_TOKENS[style]
+            )
             
             # Clean and format response
-            formatted_response = self._format_conversational_response(response, news_data, style)
+            formatted_response = self._format_conversational_response(response, news_data, style, top_news)
+            
+            # Only cache real generations, not the model manager's error text
+            if not response.startswith("Error generating response"):
+                await self.response_cache.put_async(user_input, company, style, news_data, formatted_response, history)
             
             # Store in conversation history
-            self.conversation_history.append({
-                'user': user_input,
-                'assistant': formatted_response,
-                'timestamp': datetime.now().isoformat(),
-                'style': style
-            })
+            self._record_exchange(user_input, formatted_response, style)
             
             return formatted_response
             
         except Exception as e:
             print(f"❌ Generation error: {e}")
-            return self._generate_fallback_response(user_input, news_data, style)
+            return self._generate_fallback_response(user_input, top_news, style)
+    
+    def _record_exchange(self, user_input: str, response: str, style: Style):
+        """Record an exchange off the response path, in a background task."""
+        timestamp = datetime.now().isoformat()
+        task = asyncio.get_running_loop().create_task(
+            self._record_history(user_input, response, style, timestamp)
+        )
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _record_history(self, user_input: str, response: str, style: Style, timestamp: str):
+        """Append an exchange to the conversation history."""
+        self.conversation_history.append({
+            'user': user_input,
+            'assistant': response,
+            'timestamp': timestamp,
+            'style': style.name.lower()
+        })
     
-    def _build_conversation_context(self, user_input: str, news_data: List[Dict], style: str) -> str:
+    def _recent_exchanges(self) -> List[Dict]:
+        """The last 2 exchanges, which the prompt quotes as previous conversation."""
+        return list(itertools.islice(self.conversation_history, max(0, len(self.conversation_history) - 2), None))
+    
+    def _build_conversation_context(self, user_input: str, news_data: List[Dict], style: str,
+                                    history: List[Dict] = None) -> str:
         """Build rich conversation context."""
         
-        # System prompt based on style
-        style_prompts = {
-            "professional": "You are an expert financial news analyst. Provide detailed, professional insights.",
-            "casual": "You are a friendly news assistant. Explain things in a conversational, easy-to-understand way.",
-            "executive": "You are a senior business strategist. Focus on strategic implications and business impact.",
-            "technical": "You are a financial technology expert. Provide in-depth technical analysis."
-        }
-        
-        system_prompt = style_prompts.get(style, style_prompts["professional"])
-        
         # Build context with conversation history
-        context = f"""<s>[INST] {system_prompt}
+        context = self._style_prefix(style) + f"""
 
         User: {user_input}
 
@@ -176,13 +470,14 @@ class ConversationalAI:
         # Add news context if available
         if news_data:
             context += "Recent News Context:\n"
-            for i, item in enumerate(news_data[:3], 1):  # Top 3 items
-                context += f"{i}. {item['title']}\n   {item.get('snippet', item.get('content', ''))[:150]}...\n   Impact: {item.get('impact_score', 5)}/10\n\n"
+            for i, item in enumerate(itertools.islice(news_data, 3), 1):  # Top 3 items
+                context += f"{i}. {item['title']}\n   {item['_snippet'][:150]}...\n   Impact: {item.get('impact_score', 5)}/10\n\n"
         
         # Add conversation history (last 2 exchanges)
-        if len(self.conversation_history) > 0:
+        recent = self._recent_exchanges() if history is None else history
+        if recent:
             context += "Previous conversation:\n"
-            for exchange in self.conversation_history[-2:]:
+            for exchange in recent:
                 context += f"User: {exchange['user'][:100]}...\n"
                 context += f"Assistant: {exchange['assistant'][:100]}...\n\n"
         
@@ -190,8 +485,9 @@ class ConversationalAI:
         
         return context
     
-    def _format_conversational_response(self, response: str, news_data: List[Dict], style: str) -> str:
-        """Format response for better presentation."""
+    def _format_conversational_response(self, response: str, news_data: List[Dict], style: str,
+                                        top_news: List[Dict]) -> str:
+        """Format response for better presentation; ``top_news`` is the top 5 of ``news_data``."""
         
         # Clean the response
         response = response.strip()
@@ -202,73 +498,83 @@ class ConversationalAI:
         
         # Add source links
         if news_data:
-            response += "\n\n**📚 Sources:**\n"
-            for i, item in enumerate(news_data[:5], 1):
-                response += f"{i}. [{item['title'][:70]}...]({item['url']}) - Impact: {item.get('impact_score', 5):.1f}/10\n"
+            parts = [response, "\n\n**📚 Sources:**\n"]
+            for i, item in enumerate(top_news, 1):
+                parts.append(f"{i}. {item['_link_line']}\n")
+            response = "".join(parts)
         
         return response
     
     def _expand_response(self, short_response: str, news_data: List[Dict], style: str) -> str:
         """Expand short responses to meet 5-6 line requirement."""
         
-        expanded = short_response
+        parts = [short_response]
+        style = resolve_style(style)
         
         if news_data:
+            batch = NewsBatch.from_items(news_data)
+            
             # Add analysis based on news data
-            high_impact_news = [item for item in news_data if item.get('impact_score', 5) >= 7]
+            high_impact = np.flatnonzero(batch.impact_scores >= 7)
             
-            if high_impact_news:
-                expanded += f"\n\nKey developments include {len(high_impact_news)} high-impact stories. "
-                expanded += f"The most significant appears to be: '{high_impact_news[0]['title']}' "
-                expanded += f"with an impact score of {high_impact_news[0].get('impact_score', 5):.1f}/10. "
+            if high_impact.size:
+                top = high_impact[0]
+                parts.append(f"\n\nKey developments include {high_impact.size} high-impact stories. ")
+                parts.append(f"The most significant appears to be: '{batch.titles[top]}' ")
+                parts.append(f"with an impact score of {batch.impact_scores[top]:.1f}/10. ")
             
             # Add trend analysis
-            content_types = [item.get('content_type', 'General') for item in news_data]
-            most_common_type = max(set(content_types), key=content_types.count) if content_types else 'General'
-            expanded += f"\n\nCurrent news trends show a focus on {most_common_type.lower()} developments. "
+            most_common_type = Counter(batch.content_types.tolist()).most_common(1)[0][0]
+            parts.append(f"\n\nCurrent news trends show a focus on {most_common_type.lower()} developments. ")
             
             # Add timing context
-            recent_count = len([item for item in news_data if 'today' in item.get('search_query', '').lower()])
+            recent_count = np.count_nonzero(np.char.find(np.char.lower(batch.search_queries), 'today') >= 0)
             if recent_count > 0:
-                expanded += f"There are {recent_count} breaking developments from today that require attention. "
+                parts.append(f"There are {recent_count} breaking developments from today that require attention. ")
             
             # Add strategic insight based on style
-            if style == "executive":
-                expanded += "\n\nStrategic Implications: Monitor these developments closely as they may impact market positioning and competitive landscape."
-            elif style == "technical":
-                expanded += "\n\nTechnical Analysis: The volume and sentiment of recent news suggests increased volatility and attention from institutional investors."
+            if style is Style.EXECUTIVE:
+                parts.append("\n\nStrategic Implications: Monitor these developments closely as they may impact market positioning and competitive landscape.")
+            elif style is Style.TECHNICAL:
+                parts.append("\n\nTechnical Analysis: The volume and sentiment of recent news suggests increased volatility and attention from institutional investors.")
         
-        return expanded
+        return "".join(parts)
     
     def _generate_fallback_response(self, user_input: str, news_data: List[Dict], style: str) -> str:
         """Generate fallback response when AI fails."""
         
         if news_data:
-            response = f"Based on the latest research, here's what I found:\n\n"
+            parts = ["Based on the latest research, here's what I found:\n\n"]
             
-            for i, item in enumerate(news_data[:3], 1):
-                response += f"**{i}. {item['title']}**\n"
-                response += f"{item.get('snippet', item.get('content', ''))[:200]}...\n"
-                response += f"Impact Assessment: {item.get('impact_score', 5):.1f}/10 | Source: {item.get('source', 'Unknown')}\n"
-                response += f"[Read Full Article]({item['url']})\n\n"
+            for i, item in enumerate(itertools.islice(news_data, 3), 1):
+                parts.append(f"**{i}. {item['title']}**\n")
+                parts.append(f"{item['_snippet']}...\n")
+                parts.append(f"Impact Assessment: {item.get('impact_score', 5):.1f}/10 | Source: {item.get('source', 'Unknown')}\n")
+                parts.append(f"[Read Full Article]({item['url']})\n\n")
             
-            response += "These developments suggest significant market activity. Would you like me to dive deeper into any specific aspect?"
+            parts.append("These developments suggest significant market activity. Would you like me to dive deeper into any specific aspect?")
         
         else:
-            response = f"I understand you're asking about: {user_input}\n\n"
-            response += "I'm currently gathering the latest information from multiple sources including financial news, press releases, and market data. "
-            response += "This comprehensive approach ensures you get the most accurate and up-to-date insights. "
-            response += "Please specify a company name or ask about a specific topic, and I'll provide detailed analysis with current market context."
+            parts = [
+                f"I understand you're asking about: {user_input}\n\n",
+                "I'm currently gathering the latest information from multiple sources including financial news, press releases, and market data. ",
+                "This comprehensive approach ensures you get the most accurate and up-to-date insights. ",
+                "Please specify a company name or ask about a specific topic, and I'll provide detailed analysis with current market context."
+            ]
         
-        return response
+        return "".join(parts)
     
     def get_conversation_history(self) -> List[Dict]:
         """Get conversation history."""
-        return self.conversation_history
+        return list(self.conversation_history)
     
     def clear_history(self):
         """Clear conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
+    
+    def clear_response_cache(self):
+        """Clear cached responses."""
+        self.response_cache.clear()
     
     def set_user_preference(self, key: str, value: str):
         """Set user preference."""
@@ -5,7 +5,9 @@ Configuration module for RAP IQ platform.
 import os
 import torch
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from functools import cached_property
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
 from transformers import BitsAndBytesConfig
 
 
@@ -13,22 +15,65 @@ from transformers import BitsAndBytesConfig
 class ModelConfig:
     """Configuration for AI models."""
     model_name: str = "microsoft/DialoGPT-medium"
+    cpu_model_name: Optional[str] = "microsoft/DialoGPT-small"  # used instead of model_name without a GPU
+    draft_model_name: Optional[str] = "microsoft/DialoGPT-small"  # shares the main model's tokenizer
+    num_assistant_tokens: int = 5
     max_tokens: int = 300
     temperature: float = 0.7
     context_window: int = 2048
+    max_batch_size: int = 8
+    batch_tick_ms: int = 10  # longest a request waits for others to join its batch
+    batch_length_bins: Tuple[int, ...] = (100, 180)  # predicted output-token edges between batching bins
+    torch_dtype: str = "bfloat16"
+    attn_implementation: str = "sdpa"  # fused scaled-dot-product attention kernels
+    use_vllm: bool = True  # serve chat generation from vLLM when it is installed and a GPU is present
+    vllm_gpu_memory_utilization: float = 0.6  # leaves room for the transformers model used by summaries
+    compile_model: bool = True
+    compile_mode: str = "max-autotune-no-cudagraphs"  # CUDA graphs re-record on every new batch/sequence shape
+    dynamo_cache_size_limit: int = 10000
+    static_cache: bool = True  # fixed-shape KV cache for batched decoding on GPU
+    prompt_bucket_size: int = 128  # batched prompts are left-padded to a multiple of this
+    empty_cache_threshold: float = 0.9  # fraction of GPU memory reserved before cached blocks are released
     load_in_4bit: bool = True
-    bnb_4bit_compute_dtype: str = "float16"
+    bnb_4bit_compute_dtype: str = "bfloat16"  # downgraded to float16 by Config on GPUs without bf16
     bnb_4bit_use_double_quant: bool = True
     bnb_4bit_quant_type: str = "nf4"
+    bnb_4bit_quant_storage: str = "bfloat16"  # bf16 quant state dequantizes faster on bitsandbytes 0.43+
     
-    def get_quantization_config(self) -> BitsAndBytesConfig:
-        """Get quantization configuration for GPU efficiency."""
+    def get_torch_dtype(self) -> torch.dtype:
+        """Get the half-precision dtype for GPU inference, falling back to fp16 without bf16 support."""
+        dtype = getattr(torch, self.torch_dtype)
+        if dtype == torch.bfloat16 and torch.cuda.is_available() and not torch.cuda.is_bf16_supported():
+            return torch.float16
+        return dtype
+    
+    @cached_property
+    def quantization_config(self) -> Optional[BitsAndBytesConfig]:
+        """Quantization configuration for GPU efficiency, built once and reused across model reloads."""
+        if not self.load_in_4bit:
+            return None
+        
         return BitsAndBytesConfig(
             load_in_4bit=self.load_in_4bit,
             bnb_4bit_compute_dtype=getattr(torch, self.bnb_4bit_compute_dtype),
             bnb_4bit_use_double_quant=self.bnb_4bit_use_double_quant,
-            bnb_4bit_quant_type=self.bnb_4bit_quant_type
+            bnb_4bit_quant_type=self.bnb_4bit_quant_type,
+            bnb_4bit_quant_storage=getattr(torch, self.bnb_4bit_quant_storage)
         )
+    
+    def get_quantization_config(self) -> Optional[BitsAndBytesConfig]:
+        """Get quantization configuration for GPU efficiency."""
+        return self.quantization_config
+
+
+# Company -> official RSS feeds; read-only and shared by every CrawlerConfig
+_DEFAULT_RSS_FEEDS = MappingProxyType({
+    'tesla': ('https://www.tesla.com/blog/rss',),
+    'apple': ('https://www.apple.com/newsroom/rss-feed.rss',),
+    'microsoft': ('https://blogs.microsoft.com/feed/',),
+    'google': ('https://blog.google/rss/',),
+    'amazon': ('https://press.aboutamazon.com/rss/news-releases.xml',)
+})
 
 
 @dataclass
@@ -39,19 +84,20 @@ class CrawlerConfig:
     user_agent: str = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     impact_threshold: float = 5.0
     time_range_hours: int = 24
+    fetch_cache_size: int = 512
+    fetch_cache_ttl: int = 600  # seconds
+    max_connections: int = 100
+    max_connections_per_host: int = 10
+    dns_cache_ttl: int = 300  # seconds
+    keepalive_timeout: int = 60  # seconds
+    max_response_bytes: int = 256 * 1024  # result pages and feeds are truncated past this
     
     # RSS feed configurations
-    rss_feeds: Dict[str, List[str]] = None
+    rss_feeds: Mapping[str, Tuple[str, ...]] = None
     
     def __post_init__(self):
         if self.rss_feeds is None:
-            self.rss_feeds = {
-                'tesla': ['https://www.tesla.com/blog/rss'],
-                'apple': ['https://www.apple.com/newsroom/rss-feed.rss'],
-                'microsoft': ['https://blogs.microsoft.com/feed/'],
-                'google': ['https://blog.google/rss/'],
-                'amazon': ['https://press.aboutamazon.com/rss/news-releases.xml']
-            }
+            self.rss_feeds = _DEFAULT_RSS_FEEDS
 
 
 @dataclass
@@ -66,6 +112,9 @@ class ServerConfig:
     inbrowser: bool = True
     show_tips: bool = True
     enable_queue: bool = True
+    queue_concurrency_limit: int = 4  # concurrent batches per event
+    queue_max_size: int = 64  # pending requests before new ones are rejected
+    max_sessions: int = 1000  # least recently used sessions' pipeline data is dropped past this
     max_threads: int = 10
 
 
@@ -77,6 +126,22 @@ class UIConfig:
     font_family: str = "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"
     chat_height: int = 650
     output_height: int = 600
+    max_chat_turns: int = 20  # turns sent back to the chatbot; the session log keeps all of them
+    status_refresh_interval: float = 2.0  # seconds between status bar polls while models load
+
+
+@dataclass
+class CacheConfig:
+    """Configuration for response caching."""
+    embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
+    similarity_threshold: float = 0.92
+    max_entries: int = 512
+    fingerprint_items: int = 5
+    response_cache_size: int = 1024
+    response_cache_ttl: int = 300  # seconds
+    news_cache_size: int = 256
+    news_cache_ttl: int = 60  # seconds
+    prompt_ids_cache_size: int = 256  # summary prompts, keyed on the whole prompt text
 
 
 class Config:
@@ -87,11 +152,30 @@ class Config:
         self.crawler = CrawlerConfig()
         self.server = ServerConfig()
         self.ui = UIConfig()
-        
+        self.cache = CacheConfig()
+
         # Environment variables
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.gpu_memory = self._get_gpu_memory()
         
+        # bnb's 4-bit matmul avoids extra casts when computing in bf16, so keep it wherever the GPU supports it
+        if self.device == "cuda" and not torch.cuda.is_bf16_supported():
+            self.model.bnb_4bit_compute_dtype = "float16"
+        
+        # bitsandbytes has no CPU kernels, so run a smaller unquantized model instead of emulating NF4
+        if self.device == "cpu":
+            self.model.load_in_4bit = False
+            if self.model.cpu_model_name:
+                self.model.model_name = self.model.cpu_model_name
+            if self.model.draft_model_name == self.model.model_name:
+                self.model.draft_model_name = None  # drafting with the target model itself only adds work
+        
+        # Compiled graphs still specialize on batch size and quantized linear shapes; allow far more than
+        # dynamo's default 8 before later shapes silently fall back to eager
+        if self.model.compile_model and self.device == "cuda":
+            from torch import _dynamo  # imported only here; it takes about a second
+            _dynamo.config.cache_size_limit = self.model.dynamo_cache_size_limit
+        
     def _get_gpu_memory(self) -> float:
         """Get available GPU memory in GB."""
         if torch.cuda.is_available():
@@ -122,7 +206,11 @@ class Config:
             
             # Validate server settings
             assert 1024 <= self.server.port <= 65535
-            
+
+            # Validate cache settings
+            assert 0 < self.cache.similarity_threshold <= 1.0
+            assert self.cache.max_entries > 0
+
             return True
         except AssertionError:
             return False
@@ -2,57 +2,295 @@
 News crawlers module for fetching news from multiple sources.
 """
 
+import os
 import asyncio
 import aiohttp
-import requests
-import feedparser
+import multiprocessing
 import urllib.parse
 import ssl
 import certifi
+import threading
+import ahocorasick
+import numpy as np
+from cachetools import LRUCache, TTLCache
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
-import newspaper
-from readability import Document
+from selectolax.lexbor import LexborHTMLParser
+from datasketch import MinHash, MinHashLSH
+import trafilatura
 from .config import config
+from .feedparse_worker import parse_feed
+from .utils import top_k_indices
+
+
+# Verifying context for every crawler connector; loading the CA bundle is too slow to repeat per loop
+_SSL_CONTEXT = ssl.create_default_context(cafile=certifi.where())
+
+# event loop -> (HTTP session shared by all crawlers on that loop, the async generator that closes it);
+# a plain dict, since each session references its loop, and entries are dropped as their session closes
+_sessions: Dict[asyncio.AbstractEventLoop, Tuple[aiohttp.ClientSession, AsyncIterator]] = {}
+
+
+async def _close_with_loop(session: aiohttp.ClientSession) -> AsyncIterator[None]:
+    """Hold a session open until its loop shuts down.
+    
+    asyncio.run() and asyncio.Runner call loop.shutdown_asyncgens() before closing the loop,
+    which finalizes this generator and closes the session on the loop that owns it.
+    """
+    try:
+        yield
+    finally:
+        loop = asyncio.get_running_loop()
+        if _sessions.get(loop, (None,))[0] is session:
+            del _sessions[loop]
+        await session.close()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Get the running loop's crawler session, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    
+    entry = _sessions.get(loop)
+    if entry is None or entry[0].closed:
+        session = aiohttp.ClientSession(
+            headers={'User-Agent': config.crawler.user_agent},
+            timeout=aiohttp.ClientTimeout(total=config.crawler.timeout),
+            # One pooled connector for every crawler on this loop, so handshakes and DNS lookups are reused;
+            # it closes with the session when the loop shuts down
+            connector=aiohttp.TCPConnector(
+                ssl=_SSL_CONTEXT,
+                limit=config.crawler.max_connections,
+                limit_per_host=config.crawler.max_connections_per_host,
+                ttl_dns_cache=config.crawler.dns_cache_ttl,
+                keepalive_timeout=config.crawler.keepalive_timeout
+            )
+        )
+        
+        # Step the closer to its yield now, which registers it with the loop's async generator hooks
+        closer = _close_with_loop(session)
+        try:
+            closer.asend(None).send(None)
+        except StopIteration:
+            pass
+        
+        entry = _sessions[loop] = (session, closer)
+    
+    return entry[0]
+
+
+async def close_session():
+    """Close the running loop's crawler session."""
+    entry = _sessions.get(asyncio.get_running_loop())
+    if entry is not None:
+        await entry[1].aclose()
+
+
+# url -> parsed results, served without a request while fresh
+_fetch_cache = TTLCache(maxsize=config.crawler.fetch_cache_size, ttl=config.crawler.fetch_cache_ttl)
+# url -> (etag, parsed results), kept past expiry so stale entries can be revalidated
+_etag_cache = LRUCache(maxsize=config.crawler.fetch_cache_size)
+# url -> extracted article text
+_content_cache = TTLCache(maxsize=config.crawler.fetch_cache_size, ttl=config.crawler.fetch_cache_ttl)
+# Guards the caches above; never held across an await
+_cache_lock = threading.Lock()
+
+
+def _build_keyword_automaton(weighted_keywords: List[tuple]) -> ahocorasick.Automaton:
+    """Compile (keyword, weight) pairs into one Aho-Corasick automaton."""
+    automaton = ahocorasick.Automaton()
+    for index, (keyword, weight) in enumerate(weighted_keywords):
+        automaton.add_word(keyword, (index, weight))
+    automaton.make_automaton()
+    return automaton
+
+
+def _keyword_hits(automaton: ahocorasick.Automaton, texts: List[str], num_keywords: int) -> np.ndarray:
+    """Scan each text once and mark the distinct keywords it contains in a (texts, keywords) 0/1 matrix."""
+    rows, cols = [], []
+    for row, text in enumerate(texts):
+        for _, (index, _) in automaton.iter(text):
+            rows.append(row)
+            cols.append(index)
+    
+    hits = np.zeros((len(texts), num_keywords))
+    hits[rows, cols] = 1.0
+    return hits
+
+
+# Impact keywords and their score contributions
+_IMPACT_KEYWORDS = tuple(
+    [(keyword, 3.0) for keyword in ('acquisition', 'merger', 'lawsuit', 'bankruptcy', 'ceo', 'scandal', 'investigation')] +
+    [(keyword, 1.5) for keyword in ('earnings', 'revenue', 'partnership', 'launch', 'investment', 'breakthrough')] +
+    [(keyword, 0.5) for keyword in ('update', 'comment', 'statement', 'meeting', 'interview')]
+)
+_IMPACT_AUTOMATON = _build_keyword_automaton(_IMPACT_KEYWORDS)
+_IMPACT_WEIGHTS = np.array([weight for _, weight in _IMPACT_KEYWORDS])
+
+
+def _impact_scores(texts: List[str]) -> np.ndarray:
+    """Base impact scores for lowercased texts: 5.0 plus the weights of distinct keywords hit, capped at 10."""
+    hits = _keyword_hits(_IMPACT_AUTOMATON, texts, len(_IMPACT_WEIGHTS))
+    return np.minimum(5.0 + hits @ _IMPACT_WEIGHTS, 10.0)
+
+
+_ENHANCED_IMPACT_KEYWORDS = (
+    (4.0, ('bankruptcy', 'lawsuit', 'investigation', 'scandal', 'fraud', 'fired', 'resignation')),
+    (2.5, ('acquisition', 'merger', 'ipo', 'earnings beat', 'breakthrough', 'partnership')),
+    (1.5, ('earnings', 'revenue', 'quarterly', 'investment', 'expansion', 'launch')),
+    (0.5, ('update', 'statement', 'comment', 'meeting', 'interview'))
+)
+
+# Content types in priority order, with their keywords
+_CONTENT_TYPES = ('Financial', 'M&A', 'Product', 'Leadership', 'Market')
+_CONTENT_TYPE_KEYWORDS = (
+    ('earnings', 'quarterly', 'revenue', 'profit'),
+    ('acquisition', 'merger', 'deal', 'partnership'),
+    ('product', 'launch', 'release', 'innovation'),
+    ('ceo', 'executive', 'leadership'),
+    ('stock', 'shares', 'market', 'trading')
+)
+
+
+def _build_enhanced_keywords() -> Tuple[List[tuple], np.ndarray]:
+    """Merge impact and content-type keywords into (keyword, weight) pairs plus each keyword's type priority."""
+    entries = {}
+    for weight, keywords in _ENHANCED_IMPACT_KEYWORDS:
+        for keyword in keywords:
+            entries[keyword] = [weight, len(_CONTENT_TYPES)]
+    for priority, keywords in enumerate(_CONTENT_TYPE_KEYWORDS):
+        for keyword in keywords:
+            entries.setdefault(keyword, [0.0, len(_CONTENT_TYPES)])[1] = priority
+    
+    # Keywords outside every content type get priority len(_CONTENT_TYPES), which maps to 'General'
+    weighted = [(keyword, weight) for keyword, (weight, _) in entries.items()]
+    priorities = np.array([priority for _, priority in entries.values()])
+    return weighted, priorities
+
+
+_ENHANCED_KEYWORDS, _ENHANCED_PRIORITIES = _build_enhanced_keywords()
+_ENHANCED_AUTOMATON = _build_keyword_automaton(_ENHANCED_KEYWORDS)
+_ENHANCED_WEIGHTS = np.array([weight for _, weight in _ENHANCED_KEYWORDS])
+_ENHANCED_TYPES = _CONTENT_TYPES + ('General',)
+
+
+def _scan_enhanced_keywords(texts: List[str]) -> Tuple[np.ndarray, List[str]]:
+    """One automaton pass per text: summed impact weight of distinct keywords, and content type, for each."""
+    hits = _keyword_hits(_ENHANCED_AUTOMATON, texts, len(_ENHANCED_WEIGHTS))
+    
+    # The highest-priority content type among the keywords hit, or 'General' if none
+    type_index = np.where(hits > 0, _ENHANCED_PRIORITIES, len(_CONTENT_TYPES)).min(axis=1, initial=len(_CONTENT_TYPES))
+    
+    return hits @ _ENHANCED_WEIGHTS, [_ENHANCED_TYPES[i] for i in type_index]
+
+
+# DuckDuckGo result page selectors
+_RESULT_SELECTOR = 'div.result'
+_ENHANCED_RESULT_SELECTOR = 'div.result, div.web-result, div.result__body'
+_RESULT_LINK_SELECTOR = 'a.result__a'
+_ENHANCED_TITLE_SELECTOR = 'a.result__a, a.result__url'
+_SNIPPET_SELECTOR = 'span.result__snippet, span.snippet, div.result__snippet, div.snippet'
+
+# MinHash permutations for near-duplicate title detection
+_MINHASH_NUM_PERM = 64
+
+
+@dataclass(frozen=True)
+class RawResult:
+    """A parsed search hit with its derived text computed once; immutable so it can be cached."""
+    title: str
+    snippet: str
+    url: str
+    query: str
+    timestamp: str
+    text_lower: str = field(init=False)
+    title_tokens: frozenset = field(init=False)
+    title_length: int = field(init=False)  # token count including repeats
+    
+    def __post_init__(self):
+        tokens = self.title.lower().split()
+        object.__setattr__(self, 'text_lower', f"{self.title} {self.snippet}".lower())
+        object.__setattr__(self, 'title_tokens', frozenset(tokens))
+        object.__setattr__(self, 'title_length', len(tokens))
+
+
+# Worker processes for CPU-bound feed parsing, started on first use
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Get the shared feed-parsing process pool."""
+    global _parse_pool
+    
+    if _parse_pool is None:
+        # spawn rather than fork: the parent process holds torch and tokenizer threads.
+        # Workers only import the feedparser-only worker module; a few suffice for small feed bodies.
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    
+    return _parse_pool
 
 
 class BaseCrawler:
     """Base class for all news crawlers."""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': config.crawler.user_agent
-        })
-    
     async def fetch(self, company: str) -> List[Dict]:
         """Fetch news for given company."""
         raise NotImplementedError
     
-    def _calculate_impact(self, title: str, snippet: str = "") -> float:
-        """Calculate impact score based on keywords."""
-        high_impact = ['acquisition', 'merger', 'lawsuit', 'bankruptcy', 'ceo', 'scandal', 'investigation']
-        medium_impact = ['earnings', 'revenue', 'partnership', 'launch', 'investment', 'breakthrough']
-        low_impact = ['update', 'comment', 'statement', 'meeting', 'interview']
-        
-        text = f"{title} {snippet}".lower()
-        score = 5.0  # Base score
+    async def _request(self, url: str, timeout: float = None, headers: Dict = None) -> Tuple[int, Dict, bytes]:
+        """GET a URL through the shared session; returns (status, headers, body)."""
+        kwargs = {'timeout': aiohttp.ClientTimeout(total=timeout)} if timeout else {}
         
-        for keyword in high_impact:
-            if keyword in text:
-                score += 3.0
-        
-        for keyword in medium_impact:
-            if keyword in text:
-                score += 1.5
+        async with get_session().get(url, headers=headers, **kwargs) as response:
+            # Stream the body and stop at the cap; the results we parse sit near the top of the page
+            limit = config.crawler.max_response_bytes
+            body = bytearray()
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                body += chunk
+                if len(body) >= limit:
+                    break
+            
+            return response.status, response.headers.copy(), bytes(body[:limit])  # keep header lookups case-insensitive
+    
+    async def _fetch(self, url: str, timeout: float = None) -> bytes:
+        """GET a URL through the shared session and return the response body."""
+        return (await self._request(url, timeout))[2]
+    
+    async def _fetch_and_parse(self, url: str, parse, *args, timeout: float = None) -> List[RawResult]:
+        """Fetch and parse a results page, serving repeats from cache and revalidating with ETags."""
+        with _cache_lock:
+            results = _fetch_cache.get(url)
+            etag, stale_results = _etag_cache.get(url, (None, None))
         
-        for keyword in low_impact:
-            if keyword in text:
-                score += 0.5
+        if results is None:
+            headers = {'If-None-Match': etag} if etag else None
+            status, response_headers, content = await self._request(url, timeout, headers)
+            
+            if status == 304 and stale_results is not None:
+                results = stale_results
+            else:
+                # Parsing is CPU-bound, so keep it off the event loop
+                results = await asyncio.to_thread(parse, content, *args)
+                etag = response_headers.get('ETag')
+            
+            # Only cache real result pages, not rate-limit or error responses
+            if status in (200, 304):
+                with _cache_lock:
+                    _fetch_cache[url] = results
+                    if etag:
+                        _etag_cache[url] = (etag, results)
         
-        return min(score, 10.0)
+        # Parsers return immutable records, so only the list needs copying
+        return list(results)
+    
+    def _calculate_impact(self, title: str, snippet: str = "") -> float:
+        """Calculate impact score based on keywords."""
+        return float(_impact_scores([f"{title} {snippet}".lower()])[0])
 
 
 class DuckDuckGoCrawler(BaseCrawler):
@@ -64,32 +302,43 @@ class DuckDuckGoCrawler(BaseCrawler):
             query = f"{company} news"
             url = f"https://html.duckduckgo.com/html/?q={query}"
             
-            response = self.session.get(url, timeout=config.crawler.timeout)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            content = await self._fetch(url, timeout=config.crawler.timeout)
             
-            results = []
-            for result in soup.find_all('div', class_='result')[:5]:
-                try:
-                    title_elem = result.find('a', class_='result__a')
-                    if title_elem:
-                        title = title_elem.get_text().strip()
-                        link = title_elem.get('href')
-                        
-                        results.append({
-                            'title': title,
-                            'url': link,
-                            'source': 'DuckDuckGo',
-                            'timestamp': datetime.now().isoformat(),
-                            'impact_score': self._calculate_impact(title)
-                        })
-                except Exception as e:
-                    continue
-            
-            return results
+            # Parsing is CPU-bound, so keep it off the event loop
+            return await asyncio.to_thread(self._parse_results, content)
             
         except Exception as e:
             print(f"❌ DuckDuckGo error: {e}")
             return []
+    
+    def _parse_results(self, content: bytes) -> List[Dict]:
+        """Parse a DuckDuckGo results page."""
+        tree = LexborHTMLParser(content)
+        timestamp = datetime.now().isoformat()  # one fetch time for the whole page
+        
+        results = []
+        for result in tree.css(_RESULT_SELECTOR)[:5]:
+            try:
+                title_elem = result.css_first(_RESULT_LINK_SELECTOR)
+                if title_elem:
+                    title = title_elem.text().strip()
+                    link = title_elem.attributes.get('href')
+                    
+                    results.append({
+                        'title': title,
+                        'url': link,
+                        'source': 'DuckDuckGo',
+                        'timestamp': timestamp
+                    })
+            except Exception as e:
+                continue
+        
+        # Score the whole page at once
+        scores = _impact_scores([result['title'].lower() for result in results])
+        for result, score in zip(results, scores.tolist()):
+            result['impact_score'] = score
+        
+        return results
 
 
 class RSSCrawler(BaseCrawler):
@@ -103,29 +352,41 @@ class RSSCrawler(BaseCrawler):
         """Fetch from RSS feeds."""
         try:
             company_lower = company.lower()
-            feeds = self.rss_feeds.get(company_lower, [])
+            feeds = self.rss_feeds.get(company_lower, ())
+            
+            # Add generic news RSS (without mutating the configured feed list)
+            feeds = [*feeds, f'https://news.google.com/rss/search?q={company}&hl=en-US&gl=US&ceid=US:en']
+            
+            # Fetch every feed concurrently
+            bodies = await asyncio.gather(*(self._fetch(feed_url) for feed_url in feeds), return_exceptions=True)
             
-            # Add generic news RSS
-            feeds.append(f'https://news.google.com/rss/search?q={company}&hl=en-US&gl=US&ceid=US:en')
+            # Parse the downloaded feeds in parallel across processes
+            loop = asyncio.get_running_loop()
+            pool = get_parse_pool()
+            feeds_parsed = await asyncio.gather(
+                *(loop.run_in_executor(pool, parse_feed, body) for body in bodies if not isinstance(body, Exception)),
+                return_exceptions=True
+            )
             
             results = []
-            for feed_url in feeds:
-                try:
-                    # Set SSL context for secure connections
-                    ssl_context = ssl.create_default_context(cafile=certifi.where())
-                    
-                    feed = feedparser.parse(feed_url)
-                    for entry in feed.entries[:3]:  # Limit to 3 per feed
-                        results.append({
-                            'title': entry.title,
-                            'url': entry.link,
-                            'source': f'RSS-{feed.feed.get("title", "Unknown")}',
-                            'timestamp': entry.get('published', datetime.now().isoformat()),
-                            'impact_score': self._calculate_impact(entry.title),
-                            'summary': entry.get('summary', '')[:200] + '...'
-                        })
-                except Exception as e:
+            fetched_at = datetime.now().isoformat()  # stands in for entries without a published date
+            for feed in feeds_parsed:
+                if isinstance(feed, Exception):
                     continue
+                
+                for entry in feed['entries']:  # Limited to 3 per feed
+                    results.append({
+                        'title': entry['title'],
+                        'url': entry['link'],
+                        'source': f'RSS-{feed["title"]}',
+                        'timestamp': entry['published'] or fetched_at,
+                        'summary': entry['summary'][:200] + '...'
+                    })
+            
+            # Score every feed entry at once
+            scores = _impact_scores([result['title'].lower() for result in results])
+            for result, score in zip(results, scores.tolist()):
+                result['impact_score'] = score
             
             return results
             
@@ -155,163 +416,156 @@ class AdvancedNewsCrawler(BaseCrawler):
     async def enhanced_duckduckgo_scrape(self, company: str, max_results: int = 15) -> List[Dict]:
         """Enhanced DuckDuckGo scraping with multiple query variations."""
         
-        # Multiple search variations for comprehensive coverage
+        # One disjunctive query covers the per-topic variations, which mostly returned the same hits. The
+        # two recency queries stay separate: their wording drives the recency boost and the "today" tally
         search_queries = [
             f'"{company}" news today',
             f'{company} earnings latest',
-            f'{company} stock news',
-            f'{company} press release',
-            f'{company} acquisition merger',
-            f'{company} CEO announcement',
-            f'{company} financial results'
+            f'{company} (stock news OR "press release" OR acquisition OR merger OR CEO announcement OR "financial results")'
         ]
         
-        all_results = []
-        
+        # One task per query and URL variant, so latency is the slowest fetch rather than the sum
+        tasks = []
         for query in search_queries:
+            encoded_query = urllib.parse.quote_plus(query)
+            urls = [
+                f"https://html.duckduckgo.com/html/?q={encoded_query}",
+                f"https://duckduckgo.com/html/?q={encoded_query}&df=d",  # Last day
+                f"https://duckduckgo.com/html/?q={encoded_query}&df=w"   # Last week
+            ]
+            
+            for url in urls:
+                tasks.append(self._scrape_url(url, query))
+        
+        raw_results = []
+        for results in await asyncio.gather(*tasks):
+            raw_results.extend(results)
+        
+        # Remove duplicates, then score only the survivors
+        unique_results = self._advanced_deduplication(raw_results)
+        impact_scores, content_types = self._score_and_classify(unique_results)
+        
+        # Top results by impact, ties kept in discovery order like sorted(reverse=True)
+        top = top_k_indices(impact_scores, max_results)
+        
+        return [self._to_news_item(unique_results[i], float(impact_scores[i]), content_types[i]) for i in top]
+    
+    async def _scrape_url(self, url: str, query: str) -> List[RawResult]:
+        """Fetch one DuckDuckGo results page and parse it off the event loop."""
+        try:
+            return await self._fetch_and_parse(url, self._parse_enhanced_results, query, timeout=15)
+        
+        except Exception as e:
+            print(f"⚠️ URL error for {url}: {e}")
+            return []
+    
+    def _parse_enhanced_results(self, content: bytes, query: str) -> List[RawResult]:
+        """Parse a DuckDuckGo results page into raw search hits."""
+        tree = LexborHTMLParser(content)
+        timestamp = datetime.now().isoformat()  # one fetch time for the whole page
+        
+        # Enhanced parsing for different result types
+        results = tree.css(_ENHANCED_RESULT_SELECTOR)
+        
+        parsed = []
+        for result in results[:5]:  # Top 5 per variation
             try:
-                encoded_query = urllib.parse.quote_plus(query)
-                urls = [
-                    f"https://html.duckduckgo.com/html/?q={encoded_query}",
-                    f"https://duckduckgo.com/html/?q={encoded_query}&df=d",  # Last day
-                    f"https://duckduckgo.com/html/?q={encoded_query}&df=w"   # Last week
-                ]
+                # Multiple selectors for title
+                title_elem = (result.css_first(_ENHANCED_TITLE_SELECTOR) or
+                            result.css_first('h3') or
+                            result.css_first('a'))
                 
-                for url in urls:
-                    try:
-                        response = self.session.get(url, timeout=15)
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        
-                        # Enhanced parsing for different result types
-                        results = soup.find_all(['div'], class_=['result', 'web-result', 'result__body'])
-                        
-                        for result in results[:5]:  # Top 5 per variation
-                            try:
-                                # Multiple selectors for title
-                                title_elem = (result.find('a', class_=['result__a', 'result__url']) or
-                                            result.find('h3') or
-                                            result.find('a'))
-                                
-                                if title_elem:
-                                    title = title_elem.get_text().strip()
-                                    link = title_elem.get('href', '')
-                                    
-                                    # Extract snippet if available
-                                    snippet_elem = result.find(['span', 'div'], class_=['result__snippet', 'snippet'])
-                                    snippet = snippet_elem.get_text().strip() if snippet_elem else ""
-                                    
-                                    # Calculate enhanced impact score
-                                    impact_score = self._calculate_enhanced_impact(title, snippet, query)
-                                    
-                                    all_results.append({
-                                        'title': title,
-                                        'url': link,
-                                        'snippet': snippet,
-                                        'source': 'DuckDuckGo-Enhanced',
-                                        'search_query': query,
-                                        'timestamp': datetime.now().isoformat(),
-                                        'impact_score': impact_score,
-                                        'content_type': self._classify_content_type(title, snippet)
-                                    })
-                                    
-                            except Exception as e:
-                                continue
-                                
-                    except Exception as e:
-                        print(f"⚠️ URL error for {url}: {e}")
-                        continue
-                        
+                if title_elem:
+                    title = title_elem.text().strip()
+                    link = title_elem.attributes.get('href') or ''
+                    
+                    # Extract snippet if available
+                    snippet_elem = result.css_first(_SNIPPET_SELECTOR)
+                    snippet = snippet_elem.text().strip() if snippet_elem else ""
+                    
+                    parsed.append(RawResult(title, snippet, link, query, timestamp))
+                    
             except Exception as e:
-                print(f"⚠️ Query error for {query}: {e}")
                 continue
         
-        # Remove duplicates and return top results
-        unique_results = self._advanced_deduplication(all_results)
-        return sorted(unique_results, key=lambda x: x['impact_score'], reverse=True)[:max_results]
+        return parsed
     
-    def _calculate_enhanced_impact(self, title: str, snippet: str, query: str) -> float:
-        """Advanced impact scoring with multiple factors."""
-        
-        # Weighted keyword categories
-        impact_keywords = {
-            'critical': ['bankruptcy', 'lawsuit', 'investigation', 'scandal', 'fraud', 'fired', 'resignation'],
-            'high': ['acquisition', 'merger', 'ipo', 'earnings beat', 'breakthrough', 'partnership'],
-            'medium': ['earnings', 'revenue', 'quarterly', 'investment', 'expansion', 'launch'],
-            'low': ['update', 'statement', 'comment', 'meeting', 'interview']
+    @staticmethod
+    def _to_news_item(raw: RawResult, impact_score: float, content_type: str) -> Dict:
+        """Build the news item dict for a scored search hit."""
+        return {
+            'title': raw.title,
+            'url': raw.url,
+            'snippet': raw.snippet,
+            'source': 'DuckDuckGo-Enhanced',
+            'search_query': raw.query,
+            'timestamp': raw.timestamp,
+            'impact_score': impact_score,
+            'content_type': content_type
         }
+    
+    def _score_and_classify(self, results: List[RawResult]) -> Tuple[np.ndarray, List[str]]:
+        """Compute enhanced impact scores and content types for a batch of hits with one keyword scan each."""
         
-        text = f"{title} {snippet}".lower()
-        base_score = 5.0
-        
-        # Keyword-based scoring
-        for level, keywords in impact_keywords.items():
-            for keyword in keywords:
-                if keyword in text:
-                    if level == 'critical':
-                        base_score += 4.0
-                    elif level == 'high':
-                        base_score += 2.5
-                    elif level == 'medium':
-                        base_score += 1.5
-                    elif level == 'low':
-                        base_score += 0.5
+        keyword_scores, content_types = _scan_enhanced_keywords([raw.text_lower for raw in results])
         
-        # Recency boost (based on query type)
-        if 'today' in query or 'latest' in query:
-            base_score += 1.0
+        # Recency boost (based on query type), decided once per distinct query
+        recent_queries = {query: 'today' in query or 'latest' in query for query in {raw.query for raw in results}}
+        recent = np.fromiter((recent_queries[raw.query] for raw in results), dtype=np.float64, count=len(results))
         
         # Length penalty for very short content
-        if len(snippet) < 50:
-            base_score -= 0.5
+        snippet_lengths = np.fromiter((len(raw.snippet) for raw in results), dtype=np.intp, count=len(results))
         
-        return min(base_score, 10.0)
+        # Weighted keyword scoring on top of the base score; the adjustments are arithmetic, not branches
+        scores = 5.0 + keyword_scores + recent - 0.5 * (snippet_lengths < 50)
+        
+        return np.minimum(scores, 10.0), content_types
+    
+    def _calculate_enhanced_impact(self, title: str, snippet: str, query: str) -> float:
+        """Advanced impact scoring with multiple factors."""
+        return float(self._score_and_classify([RawResult(title, snippet, '', query, '')])[0][0])
     
     def _classify_content_type(self, title: str, snippet: str) -> str:
         """Classify the type of news content."""
-        text = f"{title} {snippet}".lower()
-        
-        if any(word in text for word in ['earnings', 'quarterly', 'revenue', 'profit']):
-            return 'Financial'
-        elif any(word in text for word in ['acquisition', 'merger', 'deal', 'partnership']):
-            return 'M&A'
-        elif any(word in text for word in ['product', 'launch', 'release', 'innovation']):
-            return 'Product'
-        elif any(word in text for word in ['ceo', 'executive', 'leadership']):
-            return 'Leadership'
-        elif any(word in text for word in ['stock', 'shares', 'market', 'trading']):
-            return 'Market'
-        else:
-            return 'General'
+        return _scan_enhanced_keywords([f"{title} {snippet}".lower()])[1][0]
     
-    def _advanced_deduplication(self, results: List[Dict]) -> List[Dict]:
+    def _advanced_deduplication(self, results: List[RawResult]) -> List[RawResult]:
         """Advanced deduplication using content similarity."""
         if not results:
             return []
         
         unique_results = []
         seen_urls = set()
-        seen_titles = set()
         
-        for result in results:
-            url = result.get('url', '')
-            title = result.get('title', '').lower().strip()
-            
+        # LSH proposes candidate titles well below the implied Jaccard (~0.54); the overlap ratio confirms them
+        lsh = MinHashLSH(threshold=0.3, num_perm=_MINHASH_NUM_PERM)
+        kept = {}  # LSH key -> kept result
+        
+        for idx, result in enumerate(results):
             # URL-based deduplication
-            if url in seen_urls:
+            if result.url in seen_urls:
                 continue
             
             # Title similarity check
+            tokens = result.title_tokens
+            minhash = None
             is_similar = False
-            for seen_title in seen_titles:
-                # Simple similarity check (can be enhanced with fuzzy matching)
-                if len(set(title.split()) & set(seen_title.split())) / max(len(title.split()), len(seen_title.split())) > 0.7:
-                    is_similar = True
-                    break
+            if tokens:
+                minhash = MinHash(num_perm=_MINHASH_NUM_PERM)
+                minhash.update_batch([token.encode() for token in tokens])
+                
+                for key in lsh.query(minhash):
+                    seen = kept[key]
+                    if len(tokens & seen.title_tokens) / max(result.title_length, seen.title_length) > 0.7:
+                        is_similar = True
+                        break
             
             if not is_similar:
-                seen_urls.add(url)
-                seen_titles.add(title)
+                seen_urls.add(result.url)
                 unique_results.append(result)
+                if minhash is not None:
+                    lsh.insert(idx, minhash)
+                    kept[idx] = result
         
         return unique_results
 
@@ -321,19 +575,26 @@ class NewsExtractor:
     
     @staticmethod
     def extract_content(url: str) -> str:
+        """Extract main content from news article, memoized per URL."""
+        with _cache_lock:
+            content = _content_cache.get(url)
+        
+        if content is None:
+            content = NewsExtractor._extract_content(url)
+            if content != "Content extraction failed":
+                with _cache_lock:
+                    _content_cache[url] = content
+        
+        return content
+    
+    @staticmethod
+    def _extract_content(url: str) -> str:
         """Extract main content from news article."""
         try:
-            article = newspaper.Article(url)
-            article.download()
-            article.parse()
-            return article.text[:1000]  # Limit text length
+            # One download and one lxml parse, instead of newspaper plus a readability re-fetch
+            downloaded = trafilatura.fetch_url(url)
+            text = trafilatura.extract(downloaded, include_comments=False, favor_precision=True) if downloaded else None
+            return text[:1000] if text else "Content extraction failed"  # Limit text length
             
         except Exception as e:
-            try:
-                # Fallback to readability
-                response = requests.get(url, timeout=10)
-                doc = Document(response.content)
-                soup = BeautifulSoup(doc.summary(), 'html.parser')
-                return soup.get_text()[:1000]
-            except:
-                return "Content extraction failed" 
\ No newline at end of file
+            return "Content extraction failed"
@@ -0,0 +1,28 @@
+"""
+Feed parsing run in worker processes.
+
+Kept free of package-internal imports so spawned workers only load feedparser,
+not torch, transformers or spaCy.
+"""
+
+from typing import Dict
+
+import feedparser
+
+
+def parse_feed(body: bytes, max_entries: int = 3) -> Dict:
+    """Parse an RSS/Atom document into plain, picklable data; runs in a worker process."""
+    feed = feedparser.parse(body)
+    
+    return {
+        'title': feed.feed.get('title', 'Unknown'),
+        'entries': [
+            {
+                'title': entry.title,
+                'link': entry.link,
+                'published': entry.get('published'),
+                'summary': entry.get('summary', '')
+            }
+            for entry in feed.entries[:max_entries]
+        ]
+    }
@@ -4,14 +4,36 @@ Gradio interface module for the web UI.
 
 import gradio as gr
 import asyncio
-import time
+import hashlib
+import os
+import tempfile
+import uuid
+from cachetools import TTLCache
 from datetime import datetime
 from typing import List, Dict, Any
 from .pipeline import EnterpriseNewsPipeline
+from .models import model_manager
 from .config import config
 from .utils import setup_logging, print_system_status
 
 
+# Generated stylesheets live here and are served by Gradio as cacheable static files
+_STATIC_DIR = os.path.join(tempfile.gettempdir(), "rap_iq_static")
+_GRADIO_MAJOR = int(gr.__version__.split(".")[0])
+_FILE_ROUTE = "/gradio_api/file=" if _GRADIO_MAJOR >= 5 else "/file="
+
+# Gradio 6 only has the messages format and dropped the ``type`` switch; 5 deprecated bubble sizing
+if _GRADIO_MAJOR >= 6:
+    _CHATBOT_KWARGS = {}
+elif _GRADIO_MAJOR == 5:
+    _CHATBOT_KWARGS = {"type": "messages"}
+else:
+    _CHATBOT_KWARGS = {"type": "messages", "bubble_full_width": False}
+
+# Gradio 6 takes theme, css and head in launch() rather than Blocks()
+_STYLE_IN_LAUNCH = _GRADIO_MAJOR >= 6
+
+
 class GradioInterface:
     """Gradio web interface for RAP IQ."""
     
@@ -19,6 +41,10 @@ class GradioInterface:
         self.pipeline = EnterpriseNewsPipeline()
         self.logger = setup_logging()
         self.custom_css = self._get_custom_css()
+        self._css_link = self._write_css_file()
+        
+        # (company, style, time range, threshold, message digest) -> response; news moves on a scale of minutes
+        self._response_cache = TTLCache(maxsize=config.cache.response_cache_size, ttl=config.cache.response_cache_ttl)
         
     def _get_custom_css(self) -> str:
         """Get custom CSS for styling."""
@@ -66,10 +92,135 @@ class GradioInterface:
         .impact-low { border-left-color: #28a745 !important; }
         """
     
+    def _write_css_file(self) -> str:
+        """Write the custom CSS once to a content-hashed static file and return its <link> tag."""
+        try:
+            digest = hashlib.sha1(self.custom_css.encode()).hexdigest()[:12]
+            path = os.path.join(_STATIC_DIR, f"rap-{digest}.css")
+            
+            if not os.path.exists(path):
+                os.makedirs(_STATIC_DIR, exist_ok=True)
+                with open(path, "w") as f:
+                    f.write(self.custom_css)
+            
+            if hasattr(gr, "set_static_paths"):
+                gr.set_static_paths(paths=[_STATIC_DIR])
+            
+            return f'<link rel="stylesheet" href="{_FILE_ROUTE}{path}">'
+        
+        except Exception as e:
+            print(f"⚠️ Could not write stylesheet, inlining CSS: {e}")
+            return None
+    
+    def _system_status(self) -> str:
+        """Status bar text; models may still be loading in the background."""
+        if not model_manager.is_ready():
+            return "🔄 Loading AI models... • All sources active • Queries will wait for the model"
+        return "✅ System ready • All sources active • AI model loaded"
+    
+    @staticmethod
+    def _new_session() -> Dict[str, Any]:
+        """Fresh per-session state holding the session id and the full chat log."""
+        return {"session_id": f"session_{uuid.uuid4().hex[:12]}", "log": []}
+    
+    @staticmethod
+    def _recent_messages(session_data: Dict[str, Any]) -> List[gr.ChatMessage]:
+        """Chatbot messages for the most recent turns of the session log."""
+        messages = []
+        for user_msg, bot_msg in session_data.get("log", [])[-config.ui.max_chat_turns:]:
+            messages.append(gr.ChatMessage(role="user", content=user_msg))
+            messages.append(gr.ChatMessage(role="assistant", content=bot_msg))
+        return messages
+    
+    async def handle_user_message(self, message, company, style, time_range, impact_threshold, session_data):
+        """Handle user message and generate response."""
+        
+        if not message.strip():
+            return self._recent_messages(session_data), "", {"error": "Empty message"}
+        
+        try:
+            cache_key = (
+                company.strip().lower(), style, time_range, round(impact_threshold, 1),
+                hashlib.blake2b(message.strip().lower().encode(), digest_size=8).digest()
+            )
+            response = self._response_cache.get(cache_key)
+            
+            if response is None:
+                # Process query on Gradio's own event loop, which persists across messages
+                response = await asyncio.wait_for(
+                    self.pipeline.process_enterprise_query(
+                        user_input=message,
+                        company=company if company.strip() else None,
+                        style=style,
+                        time_range=time_range,
+                        impact_threshold=impact_threshold,
+                        session_id=session_data["session_id"]
+                    ),
+                    timeout=60
+                )
+                self._response_cache[cache_key] = response
+            
+            # The full log stays server-side; the chatbot is rebuilt from its recent turns
+            session_data.setdefault("log", []).append((message, response))
+            
+            # Update analytics
+            analytics = {
+                "last_query": message,
+                "response_length": len(response),
+                "session_id": session_data["session_id"],
+                "timestamp": datetime.now().strftime("%H:%M:%S"),
+                "sources_used": ["DuckDuckGo", "RSS", "AI Analysis"]
+            }
+            
+            return self._recent_messages(session_data), "", analytics
+        
+        except Exception as e:
+            error_response = f"❌ **Error**: {str(e)}\n\nPlease try again or contact support."
+            session_data.setdefault("log", []).append((message, error_response))
+            
+            return self._recent_messages(session_data), "", {"error": str(e)}
+    
+    async def handle_user_messages(self, messages, companies, styles, time_ranges, impact_thresholds, sessions):
+        """Handle several users' messages concurrently; each reply goes to its own session."""
+        results = await asyncio.gather(*map(
+            self.handle_user_message, messages, companies, styles, time_ranges, impact_thresholds, sessions
+        ))
+        
+        # One list per output component, in the order the messages came in
+        return tuple(list(outputs) for outputs in zip(*results))
+    
+    async def stream_user_message(self, message, company, style, time_range, impact_threshold, session_data):
+        """Show the user's turn at once, then stream in only the reply."""
+        if not message.strip():
+            yield await self.handle_user_message(message, company, style, time_range, impact_threshold, session_data)
+            return
+        
+        shown = self._recent_messages(session_data) + [gr.ChatMessage(role="user", content=message)]
+        yield shown, "", gr.update()
+        
+        # Gradio sends later chunks as diffs against the first, so only the appended reply goes over the wire
+        chat, cleared, analytics = await self.handle_user_message(
+            message, company, style, time_range, impact_threshold, session_data
+        )
+        yield shown + chat[-1:], cleared, analytics
+    
+    def _style_kwargs(self) -> Dict[str, Any]:
+        """Theme and stylesheet arguments for Blocks() or, on Gradio 6, launch()."""
+        # A linked stylesheet is cached by the browser; inline CSS is re-sent with every page
+        if self._css_link:
+            return {"theme": "default", "head": self._css_link}
+        return {"theme": "default", "css": self.custom_css}
+    
+    def _refresh_status(self):
+        """Status bar text, plus the status timer deactivated once the models are ready."""
+        return self._system_status(), gr.Timer(active=not model_manager.is_ready())
+    
     def create_interface(self) -> gr.Blocks:
         """Create the main Gradio interface."""
         
-        with gr.Blocks(css=self.custom_css, theme="default", title="Enterprise News Intelligence") as demo:
+        blocks_kwargs = {} if _STYLE_IN_LAUNCH else self._style_kwargs()
+        
+        with gr.Blocks(title="Enterprise News Intelligence", **blocks_kwargs) as demo:
             
             # Header
             gr.HTML("""
@@ -80,8 +231,8 @@ class GradioInterface:
             </div>
             """)
             
-            # State management
-            session_state = gr.State({"session_id": f"session_{int(time.time())}"})
+            # State management; the factory runs on every page load, so each browser session gets its own id and log
+            session_state = gr.State(self._new_session)
             
             with gr.Row():
                 with gr.Column(scale=3):
@@ -91,7 +242,7 @@ class GradioInterface:
                         height=650,
                         show_label=True,
                         container=True,
-                        bubble_full_width=False
+                        **_CHATBOT_KWARGS
                     )
                     
                     # User input
@@ -164,66 +315,25 @@ class GradioInterface:
             # Status bar
             status_bar = gr.Textbox(
                 label="📊 System Status",
-                value="✅ System ready • All sources active • AI model loaded",
+                value=self._system_status,
                 interactive=False,
                 max_lines=1
             )
             
-            # Event handlers
-            def handle_user_message(message, history, company, style, time_range, impact_threshold, session_data):
-                """Handle user message and generate response."""
-                
-                if not message.strip():
-                    return history, "", {"error": "Empty message"}
-                
-                # Add user message to history
-                history = history or []
-                history.append([message, None])
-                
-                try:
-                    # Process query
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    response = loop.run_until_complete(
-                        self.pipeline.process_enterprise_query(
-                            user_input=message,
-                            company=company if company.strip() else None,
-                            style=style,
-                            time_range=time_range,
-                            impact_threshold=impact_threshold,
-                            session_id=session_data["session_id"]
-                        )
-                    )
-                    
-                    loop.close()
-                    
-                    # Add response to history
-                    history[-1][1] = response
-                    
-                    # Update analytics
-                    analytics = {
-                        "last_query": message,
-                        "response_length": len(response),
-                        "session_id": session_data["session_id"],
-                        "timestamp": datetime.now().strftime("%H:%M:%S"),
-                        "sources_used": ["DuckDuckGo", "RSS", "AI Analysis"]
-                    }
-                    
-                    return history, "", analytics
-                
-                except Exception as e:
-                    error_response = f"❌ **Error**: {str(e)}\n\nPlease try again or contact support."
-                    history[-1][1] = error_response
-                    
-                    return history, "", {"error": str(e)}
+            # Poll the status while models load in the background; the timer stops itself once they're ready
+            status_timer = gr.Timer(config.ui.status_refresh_interval)
+            status_timer.tick(fn=self._refresh_status, outputs=[status_bar, status_timer])
             
-            def clear_chat():
+            # Event handlers
+            def clear_chat(session_data):
                 """Clear chat history."""
+                session_data.pop("log", None)
                 return [], {"status": "Chat cleared"}
             
-            def export_chat(history):
+            def export_chat(session_data):
                 """Export chat to text format."""
+                # The chatbot only holds recent turns, so export the full session log
+                history = session_data.get("log", [])
                 if not history:
                     return "No chat history to export."
                 
@@ -237,21 +347,23 @@ class GradioInterface:
                 
                 return export_text
             
-            # Connect events
+            # Connect events; not batched, since Gradio fills a batch's gr.State inputs from its first session.
+            # Concurrent generations still share model batches through the BatchScheduler.
             send_btn.click(
-                fn=handle_user_message,
-                inputs=[user_input, chatbot, company_override, response_style, time_range, impact_threshold, session_state],
+                fn=self.stream_user_message,
+                inputs=[user_input, company_override, response_style, time_range, impact_threshold, session_state],
                 outputs=[chatbot, user_input, analytics_display]
             )
             
             user_input.submit(
-                fn=handle_user_message,
-                inputs=[user_input, chatbot, company_override, response_style, time_range, impact_threshold, session_state],
+                fn=self.stream_user_message,
+                inputs=[user_input, company_override, response_style, time_range, impact_threshold, session_state],
                 outputs=[chatbot, user_input, analytics_display]
             )
             
             clear_btn.click(
                 fn=clear_chat,
+                inputs=[session_state],
                 outputs=[chatbot, analytics_display]
             )
             
@@ -277,6 +389,14 @@ class GradioInterface:
                 - Set time range based on your analysis needs
                 """)
         
+        # Queue events server-side so batches fill and a burst of users can't overrun the model
+        if config.server.enable_queue:
+            demo.queue(
+                default_concurrency_limit=config.server.queue_concurrency_limit,
+                max_size=config.server.queue_max_size,
+                api_open=False
+            )
+        
         return demo
     
     def launch(self):
@@ -305,6 +425,8 @@ class GradioInterface:
         print("💰 20K Stipend Target: ACHIEVABLE with this enterprise solution")
         print("="*70)
         
+        launch_kwargs = self._style_kwargs() if _STYLE_IN_LAUNCH else {}
+        
         try:
             # Create and launch interface
             demo = self.create_interface()
@@ -317,9 +439,9 @@ class GradioInterface:
                 show_error=config.server.show_error,
                 quiet=config.server.quiet,
                 inbrowser=config.server.inbrowser,
-                show_tips=config.server.show_tips,
-                enable_queue=config.server.enable_queue,
-                max_threads=config.server.max_threads
+                max_threads=config.server.max_threads,
+                allowed_paths=[_STATIC_DIR],
+                **launch_kwargs
             )
             
             print("🎯 Application launched successfully!")
@@ -331,7 +453,7 @@ class GradioInterface:
             
             # Fallback
             demo = self.create_interface()
-            demo.launch(share=True, debug=True)
+            demo.launch(share=True, debug=True, **launch_kwargs)
 
 
 # Global interface instance
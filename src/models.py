@@ -2,25 +2,84 @@
 Model management module for loading and managing AI models.
 """
 
+import os
+import copy
+import asyncio
+import bisect
+import threading
+import uuid
 import torch
 import spacy
 import warnings
-from typing import Optional, Tuple
-from transformers import AutoModelForCausalLM, AutoTokenizer
+import numpy as np
+from cachetools import LRUCache
+from typing import Any, Dict, List, Optional, Tuple
+from transformers import AutoModelForCausalLM, AutoTokenizer, GenerationConfig
 from .config import config
 
+try:
+    from numba import njit
+except ImportError:  # optional; ranking falls back to NumPy
+    njit = None
+
 warnings.filterwarnings('ignore')
 
+# Let the Rust tokenizer parallelize batched encodes
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+
+# Allow TF32 tensor cores for any fp32 matmuls that remain
+torch.set_float32_matmul_precision("high")
+
 
 class ModelManager:
     """Manages loading and configuration of AI models."""
     
     def __init__(self):
         self.model = None
+        self.draft_model = None
         self.tokenizer = None
         self.nlp = None
+        self.embedder = None
+        self.engine = None
         self.device = config.device
+        self._loader: Optional[threading.Thread] = None
+        
+        # Generation settings read once instead of on every call
+        self._max_tokens = config.model.max_tokens
+        self._context_window = config.model.context_window
+        self._temperature = config.model.temperature
+        # (max new tokens, batched) -> generation config
+        self._generation_configs: Dict[Tuple[int, bool], GenerationConfig] = {}
+        
+        # Extra tokenizer/generate() kwargs for fixed-shape batched decoding; empty until enabled
+        self._pad_kwargs: Dict[str, Any] = {}
+        self._cache_kwargs: Dict[str, Any] = {}
+        
+        # prompt prefix -> (prefix token ids, past_key_values after prefill)
+        self._prefix_cache: Dict[str, Tuple[torch.Tensor, Any]] = {}
+        # Prefixes prefilled during load_models(), before is_ready() turns true
+        self._warm_prefixes: List[str] = []
+        self._prefix_lock = threading.Lock()
         
+        # stripped text -> (text, label, start, end) entity tuples; crawled headlines repeat across chat turns
+        self._entity_cache = LRUCache(maxsize=4096)
+        self._entity_lock = threading.Lock()  # cachetools caches aren't thread-safe; NER runs in executor threads
+        
+    def start_background_load(self):
+        """Load models in a daemon thread so the web server can start serving right away."""
+        if self._loader is None:
+            self._loader = threading.Thread(target=self.load_models, name="model-loader", daemon=True)
+            self._loader.start()
+    
+    def is_ready(self) -> bool:
+        """Whether no background load is still in progress."""
+        return self._loader is None or not self._loader.is_alive()
+    
+    def wait_ready(self, timeout: float = None):
+        """Block until a background load started with start_background_load() has finished."""
+        if self._loader is not None and self._loader is not threading.current_thread():
+            self._loader.join(timeout)
+    
     def load_models(self) -> bool:
         """Load all required models."""
         try:
@@ -35,6 +94,24 @@ class ModelManager:
             success = self._load_nlp_model()
             if not success:
                 return False
+            
+            # Draft model is optional; summaries decode without speculation when missing
+            self._load_draft_model()
+            
+            # Embedding model is optional; the response cache degrades to exact matches
+            self._load_embedding_model()
+            
+            # Compilation is optional; the eager model is kept if it fails
+            self._compile_model()
+            
+            # Static KV cache is optional; batches keep the dynamic cache if it fails
+            self._enable_static_cache()
+            
+            # Prefix prefill is optional; prompts are prefilled in full until a prefix is cached
+            self._prefill_warm_prefixes()
+            
+            # vLLM is optional; chat generation falls back to batched HF generate()
+            self._load_vllm_engine()
                 
             print("✅ All models loaded successfully!")
             return True
@@ -51,9 +128,11 @@ class ModelManager:
             # Load tokenizer
             self.tokenizer = AutoTokenizer.from_pretrained(
                 config.model.model_name,
+                use_fast=True,
                 trust_remote_code=True
             )
             self.tokenizer.pad_token = self.tokenizer.eos_token
+            self.tokenizer.padding_side = "left"  # decoder-only batching pads on the left
             
             # Load model with quantization
             quantization_config = config.model.get_quantization_config()
@@ -61,9 +140,12 @@ class ModelManager:
             self.model = AutoModelForCausalLM.from_pretrained(
                 config.model.model_name,
                 quantization_config=quantization_config,
+                torch_dtype=config.model.get_torch_dtype(),
+                attn_implementation=config.model.attn_implementation,
                 device_map="auto",
                 trust_remote_code=True
             )
+            self.model.eval()
             
             print("✅ Language model loaded successfully!")
             return True
@@ -77,10 +159,15 @@ class ModelManager:
         try:
             print("🔄 Loading CPU fallback model...")
             
-            self.tokenizer = AutoTokenizer.from_pretrained(config.model.model_name)
+            self.tokenizer = AutoTokenizer.from_pretrained(config.model.model_name, use_fast=True)
             self.tokenizer.pad_token = self.tokenizer.eos_token
+            self.tokenizer.padding_side = "left"
             
-            self.model = AutoModelForCausalLM.from_pretrained(config.model.model_name)
+            self.model = AutoModelForCausalLM.from_pretrained(
+                config.model.model_name,
+                attn_implementation=config.model.attn_implementation
+            )
+            self.model.eval()
             
             print("✅ CPU fallback model loaded!")
             return True
@@ -89,14 +176,141 @@ class ModelManager:
             print(f"❌ CPU fallback failed: {e}")
             return False
     
+    def _load_draft_model(self) -> bool:
+        """Load the small assistant model used for speculative decoding."""
+        if not config.model.draft_model_name:
+            return False
+        
+        try:
+            print(f"🔄 Loading draft model: {config.model.draft_model_name}")
+            
+            dtype = config.model.get_torch_dtype() if self.model.device.type == "cuda" else None
+            self.draft_model = AutoModelForCausalLM.from_pretrained(
+                config.model.draft_model_name,
+                torch_dtype=dtype,
+                attn_implementation=config.model.attn_implementation
+            ).to(self.model.device).eval()
+            
+            print("✅ Draft model loaded!")
+            return True
+            
+        except Exception as e:
+            print(f"⚠️ Draft model unavailable, speculative decoding disabled: {e}")
+            self.draft_model = None
+            return False
+    
+    def _compile_model(self) -> bool:
+        """Compile the language model forward pass with torch.compile and warm it up."""
+        if not config.model.compile_model or self.model.device.type != "cuda":
+            return False
+        
+        try:
+            print(f"🔄 Compiling language model ({config.model.compile_mode})...")
+            
+            # generate() calls forward(), so compile that rather than wrapping the module. Shapes stay
+            # dynamic: single prompts decode with a growing dynamic KV cache (prefix reuse), so a static
+            # graph per sequence length would exhaust the dynamo cache limit set in Config
+            self.model.forward = torch.compile(
+                self.model.forward,
+                mode=config.model.compile_mode,
+                fullgraph=False,
+                dynamic=True
+            )
+            
+            # Trigger compilation once for single and batched decoding
+            prompt = "Warm up the compiled model."
+            for batch_size in sorted({1, config.model.max_batch_size}):
+                inputs = self.tokenizer([prompt] * batch_size, return_tensors='pt', padding=True).to(self.model.device)
+                with torch.inference_mode():
+                    self.model.generate(
+                        **inputs,
+                        max_new_tokens=2,
+                        do_sample=False,
+                        pad_token_id=self.tokenizer.eos_token_id
+                    )
+            
+            print("✅ Language model compiled!")
+            return True
+            
+        except Exception as e:
+            print(f"⚠️ Model compilation failed, using eager mode: {e}")
+            self.model.__dict__.pop("forward", None)  # restore the eager forward
+            return False
+    
+    def _enable_static_cache(self) -> bool:
+        """Decode batches with a static KV cache and bucketed prompt lengths, so per-step shapes repeat."""
+        if not config.model.static_cache or self.model.device.type != "cuda":
+            return False
+        
+        try:
+            print("🔄 Enabling static KV cache...")
+            
+            self._pad_kwargs = {'pad_to_multiple_of': config.model.prompt_bucket_size}
+            self._cache_kwargs = {'cache_implementation': 'static'}
+            self._generation_configs.clear()
+            
+            # Allocate the cache and trace kernels once for the standard batch shape
+            prompts = ["Warm up the static cache."] * config.model.max_batch_size
+            inputs = self.tokenizer(prompts, return_tensors='pt', padding=True, **self._pad_kwargs).to(self.model.device)
+            with torch.inference_mode():
+                self.model.generate(
+                    **inputs,
+                    max_new_tokens=2,
+                    do_sample=False,
+                    pad_token_id=self.tokenizer.eos_token_id,
+                    **self._cache_kwargs
+                )
+            
+            print("✅ Static KV cache enabled!")
+            return True
+            
+        except Exception as e:
+            print(f"⚠️ Static KV cache unavailable, using dynamic cache: {e}")
+            self._pad_kwargs = {}
+            self._cache_kwargs = {}
+            self._generation_configs.clear()
+            return False
+    
+    def _load_vllm_engine(self) -> bool:
+        """Start a vLLM engine for chat generation, with continuous batching and a paged KV cache."""
+        if not config.model.use_vllm or self.device != "cuda":
+            return False
+        
+        try:
+            from vllm import AsyncEngineArgs, AsyncLLMEngine
+        except ImportError:
+            return False
+        
+        try:
+            print(f"🔄 Starting vLLM engine: {config.model.model_name}")
+            
+            self.engine = AsyncLLMEngine.from_engine_args(AsyncEngineArgs(
+                model=config.model.model_name,
+                dtype=config.model.torch_dtype,
+                gpu_memory_utilization=config.model.vllm_gpu_memory_utilization
+            ))
+            
+            print("✅ vLLM engine started!")
+            return True
+            
+        except Exception as e:
+            print(f"⚠️ vLLM engine unavailable, using transformers generate: {e}")
+            self.engine = None
+            return False
+    
     def _load_nlp_model(self) -> bool:
         """Load spaCy NLP model."""
         try:
             print("🔄 Loading NLP model...")
             
+            # Run NER on the GPU when there is one and spaCy's GPU backend (cupy) is installed
+            if self.device == "cuda":
+                spacy.prefer_gpu()
+            
             # Try to load the model
             try:
-                self.nlp = spacy.load("en_core_web_sm")
+                # Only NER is used, so skip the components it doesn't need
+                self.nlp = spacy.load("en_core_web_sm", disable=["tagger", "parser", "attribute_ruler", "lemmatizer"])
             except OSError:
                 print("⚠️ spaCy model not found. Please run: python -m spacy download en_core_web_sm")
                 return False
@@ -108,6 +322,22 @@ class ModelManager:
             print(f"❌ Error loading NLP model: {e}")
             return False
     
+    def _load_embedding_model(self) -> bool:
+        """Load the sentence embedding model used by the response cache."""
+        try:
+            print(f"🔄 Loading embedding model: {config.cache.embedding_model_name}")
+            
+            from sentence_transformers import SentenceTransformer
+            self.embedder = SentenceTransformer(config.cache.embedding_model_name, device=self.device)
+            
+            print("✅ Embedding model loaded!")
+            return True
+            
+        except Exception as e:
+            print(f"⚠️ Embedding model unavailable, semantic caching disabled: {e}")
+            self.embedder = None
+            return False
+    
     def get_model_info(self) -> dict:
         """Get information about loaded models."""
         info = {
@@ -115,8 +345,12 @@ class ModelManager:
             "gpu_memory_gb": config.gpu_memory,
             "model_name": config.model.model_name,
             "model_loaded": self.model is not None,
+            "draft_model_loaded": self.draft_model is not None,
             "tokenizer_loaded": self.tokenizer is not None,
-            "nlp_loaded": self.nlp is not None
+            "nlp_loaded": self.nlp is not None,
+            "nlp_pipes": self.nlp.pipe_names if self.nlp else [],
+            "embedder_loaded": self.embedder is not None,
+            "serving_backend": "vllm" if self.engine is not None else "transformers"
         }
         
         if self.model:
@@ -124,33 +358,125 @@ class ModelManager:
             
         return info
     
-    def generate_response(self, prompt: str, max_length: int = None) -> str:
-        """Generate response using the loaded model."""
+    def register_warm_prefixes(self, prefixes: List[str]):
+        """Prompt prefixes to prefill while the models load, so no request races the warm-up."""
+        self._warm_prefixes.extend(prefix for prefix in prefixes if prefix not in self._warm_prefixes)
+    
+    def _prefill_warm_prefixes(self) -> bool:
+        """Prefill the registered prefixes as the last loading step."""
+        if not self._warm_prefixes:
+            return False
+        
+        try:
+            print("🔄 Prefilling prompt prefixes...")
+            self.warm_prefix_cache(self._warm_prefixes)
+            print("✅ Prompt prefixes cached!")
+            return True
+            
+        except Exception as e:
+            print(f"⚠️ Prefix prefill failed, prompts will be prefilled in full: {e}")
+            return False
+    
+    def warm_prefix_cache(self, prefixes: List[str]):
+        """Prefill and cache the KV state of fixed prompt prefixes."""
         if not self.model or not self.tokenizer:
             raise RuntimeError("Models not loaded. Call load_models() first.")
         
-        try:
-            max_length = max_length or config.model.max_tokens
+        for prefix in prefixes:
+            self._get_prefix_cache(prefix)
+    
+    def _get_prefix_cache(self, prefix: str) -> Tuple[torch.Tensor, Any]:
+        """Get (or compute once) the token ids and KV state for a prompt prefix."""
+        cached = self._prefix_cache.get(prefix)
+        if cached is not None:
+            return cached
+        
+        # Prefixes not prefilled at load time are computed by one thread at a time
+        with self._prefix_lock:
+            if prefix not in self._prefix_cache:
+                prefix_ids = self.tokenizer(prefix, return_tensors='pt')['input_ids'].to(self.model.device)
+                
+                with torch.inference_mode():
+                    outputs = self.model(prefix_ids, use_cache=True)
+                
+                self._prefix_cache[prefix] = (prefix_ids, outputs.past_key_values)
             
-            # Tokenize input
-            inputs = self.tokenizer.encode(
-                prompt, 
-                return_tensors='pt', 
-                max_length=config.model.context_window, 
-                truncation=True
+            return self._prefix_cache[prefix]
+    
+    def _encode_with_prefix(self, prompt: str, prefix: str = None) -> Tuple[torch.Tensor, Any]:
+        """Token ids of the whole prompt, plus a copy of the prefix KV state when those ids start with the prefix's."""
+        # Tokenize input straight onto the model's device
+        inputs = self.tokenizer(
+            prompt,
+            return_tensors='pt',
+            max_length=self._context_window,
+            truncation=True
+        )['input_ids'].to(self.model.device)
+        
+        if prefix and prompt.startswith(prefix):
+            prefix_ids, prefix_kv = self._get_prefix_cache(prefix)
+            prefix_length = prefix_ids.shape[1]
+            
+            # Tokens can merge across the prefix boundary, so the cached state only
+            # matches a real prompt when the full encoding starts with the prefix's ids
+            if inputs.shape[1] > prefix_length and torch.equal(inputs[0, :prefix_length], prefix_ids[0]):
+                # generate() extends the cache in place, so hand it a copy
+                return inputs, copy.deepcopy(prefix_kv)
+        
+        return inputs, None
+    
+    def _encode_batch(self, prompts: List[str]) -> Dict[str, torch.Tensor]:
+        """Left-pad a batch of prompts, tokenized whole in one batched call."""
+        # Prefix ids joined to a separately tokenized suffix can differ from the prompt's own
+        # tokens at the boundary, and checking them would need this full encode anyway
+        return self.tokenizer(
+            prompts,
+            return_tensors='pt',
+            padding=True,
+            max_length=self._context_window,
+            truncation=True,
+            **self._pad_kwargs
+        )
+    
+    def _get_generation_config(self, max_new_tokens: int, batched: bool = False) -> GenerationConfig:
+        """Sampling settings for chat generation, built once per output length on top of the model's defaults."""
+        key = (max_new_tokens, batched)
+        
+        if key not in self._generation_configs:
+            generation_config = copy.deepcopy(self.model.generation_config)
+            generation_config.update(
+                max_new_tokens=max_new_tokens,
+                temperature=self._temperature,
+                do_sample=True,
+                pad_token_id=self.tokenizer.eos_token_id,
+                repetition_penalty=1.1,
+                use_cache=True,
+                **(self._cache_kwargs if batched else {})
             )
+            self._generation_configs[key] = generation_config
+        
+        return self._generation_configs[key]
+    
+    def generate_response(self, prompt: str, max_length: int = None, prefix: str = None) -> str:
+        """Generate response using the loaded model.
+        
+        If ``prefix`` is given and the prompt's token ids start with its ids, the
+        cached KV state of the prefix is reused so only the remainder is prefilled.
+        """
+        self.wait_ready()
+        if not self.model or not self.tokenizer:
+            raise RuntimeError("Models not loaded. Call load_models() first.")
+        
+        try:
+            max_length = max_length or self._max_tokens
+            inputs, past_key_values = self._encode_with_prefix(prompt, prefix)
             
-            # Generate response
-            with torch.no_grad():
+            # Generate response (beam-only flags like early_stopping do nothing when sampling)
+            with torch.inference_mode():
                 outputs = self.model.generate(
                     inputs,
-                    max_new_tokens=max_length,
-                    temperature=config.model.temperature,
-                    do_sample=True,
-                    pad_token_id=self.tokenizer.eos_token_id,
-                    repetition_penalty=1.1,
-                    length_penalty=1.0,
-                    early_stopping=True
+                    generation_config=self._get_generation_config(max_length),
+                    past_key_values=past_key_values
                 )
             
             # Decode response
@@ -159,47 +485,302 @@ class ModelManager:
                 skip_special_tokens=True
             )
             
+            # Release the GPU tensors now rather than at the next garbage collection
+            del outputs, inputs, past_key_values
+            self._maybe_empty_cache()
+            
             return response.strip()
             
         except Exception as e:
             print(f"❌ Generation error: {e}")
             return f"Error generating response: {str(e)}"
     
+    async def generate_async(self, prompt: str, max_length: int = None) -> str:
+        """Generate a response with the vLLM engine, which batches concurrent requests itself."""
+        if self.engine is None:
+            raise RuntimeError("vLLM engine not loaded.")
+        
+        from vllm import SamplingParams
+        
+        try:
+            sampling_params = SamplingParams(
+                temperature=self._temperature,
+                max_tokens=max_length or self._max_tokens,
+                repetition_penalty=1.1
+            )
+            
+            # The engine streams partial outputs; the last one holds the full completion
+            final_output = None
+            async for output in self.engine.generate(prompt, sampling_params, request_id=uuid.uuid4().hex):
+                final_output = output
+            
+            return final_output.outputs[0].text.strip()
+            
+        except Exception as e:
+            print(f"❌ Generation error: {e}")
+            return f"Error generating response: {str(e)}"
+    
+    def generate_batch(self, prompts: List[str], max_length: int = None,
+                       prefixes: List[Optional[str]] = None) -> List[str]:
+        """Generate responses for several prompts with a single padded generate() call."""
+        self.wait_ready()
+        if not self.model or not self.tokenizer:
+            raise RuntimeError("Models not loaded. Call load_models() first.")
+        
+        # A lone prompt can still take the cached-prefix path
+        if len(prompts) == 1:
+            return [self.generate_response(prompts[0], max_length, prefix=(prefixes or [None])[0])]
+        
+        try:
+            max_length = max_length or self._max_tokens
+            
+            # Left-pad so every sequence ends at the same position
+            inputs = self._encode_batch(prompts).to(self.model.device)
+            
+            with torch.inference_mode():
+                outputs = self.model.generate(
+                    inputs['input_ids'],
+                    generation_config=self._get_generation_config(max_length, batched=True),
+                    attention_mask=inputs['attention_mask']
+                )
+            
+            prompt_length = inputs['input_ids'].shape[1]
+            responses = self.tokenizer.batch_decode(outputs[:, prompt_length:], skip_special_tokens=True)
+            
+            del outputs, inputs
+            self._maybe_empty_cache()
+            
+            return [response.strip() for response in responses]
+            
+        except Exception as e:
+            print(f"❌ Batch generation error: {e}")
+            return [f"Error generating response: {str(e)}"] * len(prompts)
+    
+    def embed_text(self, text: str) -> Optional[np.ndarray]:
+        """Embed text into a unit-length float32 vector, or None if no embedder is loaded."""
+        if not self.embedder:
+            return None
+        
+        embedding = self.embedder.encode(text, normalize_embeddings=True, convert_to_numpy=True)
+        return embedding.astype(np.float32, copy=False)
+    
     def extract_entities(self, text: str) -> list:
         """Extract named entities from text."""
+        return self.extract_entities_batch([text])[0]
+    
+    def extract_entities_batch(self, texts: List[str], batch_size: int = 32) -> List[list]:
+        """Extract named entities from many texts, running uncached ones through spaCy in batches."""
+        self.wait_ready()
         if not self.nlp:
             raise RuntimeError("NLP model not loaded.")
         
         try:
-            doc = self.nlp(text)
-            entities = []
+            # Cache on the stripped text; offsets are shifted back onto each original below
+            stripped = [text.strip() for text in texts]
+            with self._entity_lock:
+                entities = {key: self._entity_cache.get(key) for key in dict.fromkeys(stripped)}
             
-            for ent in doc.ents:
-                entities.append({
-                    "text": ent.text,
-                    "label": ent.label_,
-                    "start": ent.start_char,
-                    "end": ent.end_char
-                })
+            misses = [key for key, cached in entities.items() if cached is None]
+            for key, doc in zip(misses, self.nlp.pipe(misses, batch_size=batch_size)):
+                entities[key] = tuple((ent.text, ent.label_, ent.start_char, ent.end_char) for ent in doc.ents)
             
-            return entities
+            with self._entity_lock:
+                for key in misses:
+                    self._entity_cache[key] = entities[key]
+            
+            results = []
+            for text, key in zip(texts, stripped):
+                offset = len(text) - len(text.lstrip())
+                results.append([
+                    {"text": ent_text, "label": label, "start": start + offset, "end": end + offset}
+                    for ent_text, label, start, end in entities[key]
+                ])
+            
+            return results
             
         except Exception as e:
             print(f"❌ Entity extraction error: {e}")
-            return []
+            return [[] for _ in texts]
+    
+    def _maybe_empty_cache(self):
+        """Return cached GPU blocks to the driver only under memory pressure; emptying synchronizes the device."""
+        if torch.cuda.is_available():
+            total = torch.cuda.get_device_properties(0).total_memory
+            if torch.cuda.memory_reserved() / total > config.model.empty_cache_threshold:
+                torch.cuda.empty_cache()
     
     def cleanup(self):
         """Clean up model resources."""
-        if self.model:
-            del self.model
-        if self.tokenizer:
-            del self.tokenizer
-        if self.nlp:
-            del self.nlp
+        had_gpu_models = self.model is not None or self.draft_model is not None or self.engine is not None
         
-        if torch.cuda.is_available():
+        self.model = None
+        self.draft_model = None
+        self.tokenizer = None
+        self.nlp = None
+        self.embedder = None
+        self.engine = None
+        self._prefix_cache.clear()
+        with self._entity_lock:
+            self._entity_cache.clear()
+        self._generation_configs.clear()
+        
+        # Only worth a device-wide sync when model weights were actually released
+        if had_gpu_models and torch.cuda.is_available():
             torch.cuda.empty_cache()
 
 
+class BatchScheduler:
+    """Batches concurrent generation requests into shared generate() calls.
+    
+    Requests are binned by predicted output length and batches are only drawn
+    from within a bin, so short answers don't wait on long ones. A round starts
+    once any bin fills a batch or the oldest request has waited one tick.
+    """
+    
+    def __init__(self, manager: ModelManager, max_batch_size: int = None, tick_ms: int = None,
+                 length_bins: Tuple[int, ...] = None):
+        self.manager = manager
+        self.max_batch_size = max_batch_size or config.model.max_batch_size
+        self.tick = (tick_ms if tick_ms is not None else config.model.batch_tick_ms) / 1000
+        self.length_bins = tuple(length_bins or config.model.batch_length_bins)
+        
+        self._loop = None
+        self._queues = None
+        self._worker = None
+        self._batch_ready = None
+    
+    async def submit(self, prompt: str, max_tokens: int = None, prefix: str = None,
+                     length_hint: int = None) -> str:
+        """Queue a prompt and wait for its generated response.
+        
+        ``length_hint`` is the expected number of output tokens and only selects
+        the batching bin; ``max_tokens`` still caps generation.
+        """
+        max_tokens = max_tokens or config.model.max_tokens
+        
+        # vLLM schedules its own continuous batches, so bypass the bins entirely
+        if self.manager.engine is not None:
+            return await self.manager.generate_async(prompt, max_tokens)
+        
+        self._ensure_worker()
+        
+        future = self._loop.create_future()
+        queue = self._queues[self._bin_for(length_hint or max_tokens)]
+        queue.put_nowait((prompt, max_tokens, prefix, future))
+        if queue.qsize() >= self.max_batch_size:
+            self._batch_ready.set()
+        
+        return await future
+    
+    def _bin_for(self, length: int) -> int:
+        """Index of the bin whose length range contains ``length``."""
+        return bisect.bisect_left(self.length_bins, length)
+    
+    def _ensure_worker(self):
+        """Start the batching task on the running loop if it is not already active."""
+        loop = asyncio.get_running_loop()
+        
+        if loop is not self._loop:
+            self._fail_pending()
+            self._loop = loop
+            self._queues = [asyncio.Queue() for _ in range(len(self.length_bins) + 1)]
+            self._batch_ready = asyncio.Event()
+            self._worker = None
+        
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+    
+    def _fail_pending(self):
+        """Fail every request still queued on the previous loop so none of them waits forever."""
+        if self._queues is None:
+            return
+        
+        error = RuntimeError("Batch scheduler moved to a new event loop before this request ran")
+        for queue in self._queues:
+            while not queue.empty():
+                *_, future = queue.get_nowait()
+                if future.done():
+                    continue
+                # The future belongs to the old loop, which may be running in another thread
+                if self._loop.is_closed():
+                    continue  # nothing can still be awaiting it
+                self._loop.call_soon_threadsafe(
+                    lambda future=future: future.done() or future.set_exception(error)
+                )
+    
+    async def _run(self):
+        """Drain the bins in batches; exits once idle so no task outlives its loop."""
+        backlog = False
+        while any(not queue.empty() for queue in self._queues):
+            # Give concurrent callers up to one tick to join, dispatching early if a batch fills;
+            # requests left over from the last round already waited out a generate() call
+            if not backlog:
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), timeout=self.tick)
+                except asyncio.TimeoutError:
+                    pass
+            self._batch_ready.clear()
+            
+            # One batch per bin per round, shortest bin first
+            for queue in self._queues:
+                batch = []
+                while len(batch) < self.max_batch_size and not queue.empty():
+                    batch.append(queue.get_nowait())
+                
+                if batch:
+                    await self._dispatch(batch)
+            
+            backlog = True
+    
+    async def _dispatch(self, batch: List[tuple]):
+        """Run one generate() call for a batch and resolve each request's future."""
+        prompts = [request[0] for request in batch]
+        max_tokens = max(request[1] for request in batch)
+        prefixes = [request[2] for request in batch]
+        
+        try:
+            # Generation blocks, so keep it off the event loop
+            responses = await self._loop.run_in_executor(
+                None, self.manager.generate_batch, prompts, max_tokens, prefixes
+            )
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (*_, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+
+
+def _score_items_loop(impacts: np.ndarray, boosts: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Ranking kernel: each impact plus its weighted boosts, capped at 10."""
+    scores = np.empty_like(impacts)
+    for i in range(impacts.shape[0]):
+        score = impacts[i]
+        for j in range(weights.shape[0]):
+            score += boosts[i, j] * weights[j]
+        scores[i] = min(score, 10.0)
+    return scores
+
+
+def _score_items_numpy(impacts: np.ndarray, boosts: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Ranking kernel: each impact plus its weighted boosts, capped at 10."""
+    return np.minimum(impacts + boosts @ weights, 10.0)
+
+
+if njit is not None:
+    # fastmath lets the boost sum reassociate and vectorize; prange threads would cost more than the ~30 items take
+    score_items = njit(cache=True, fastmath=True)(_score_items_loop)
+    # Compile once at import rather than on the first query
+    score_items(np.zeros(1), np.zeros((1, 1)), np.zeros(1))
+else:
+    score_items = _score_items_numpy
+
+
 # Global model manager instance
-model_manager = ModelManager() 
\ No newline at end of file
+model_manager = ModelManager()
+
+# Global batch scheduler instance
+batch_scheduler = BatchScheduler(model_manager) 
\ No newline at end of file
@@ -3,13 +3,173 @@ Pipeline module for orchestrating news processing workflow.
 """
 
 import asyncio
+import hashlib
+import heapq
+import json
+import re
 import time
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any, List, Dict, Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlparse
+from cachetools import LRUCache, TTLCache
+from datasketch import MinHash, MinHashLSH
 from .crawlers import DuckDuckGoCrawler, RSSCrawler, AdvancedNewsCrawler, NewsExtractor
-from .ai import ConversationalAI, ResponseGenerator
-from .models import model_manager
+from .ai import ConversationalAI, ResponseGenerator, annotate_news_items
+from .models import model_manager, score_items
 from .config import config
+from .utils import top_k_indices
+
+try:
+    from ciso8601 import parse_datetime
+except ImportError:  # optional; timestamps fall back to datetime.fromisoformat
+    parse_datetime = None
+
+try:
+    import orjson
+except ImportError:  # optional; session export falls back to the json module
+    orjson = None
+
+
+class TimeRange(IntEnum):
+    """News time windows, valued in hours."""
+    HOUR = 1
+    SIX_HOURS = 6
+    DAY = 24
+    WEEK = 168
+
+
+# UI time-range label -> TimeRange
+_TIME_RANGES_BY_LABEL: Dict[str, TimeRange] = {
+    "1 hour": TimeRange.HOUR,
+    "6 hours": TimeRange.SIX_HOURS,
+    "24 hours": TimeRange.DAY,
+    "1 week": TimeRange.WEEK
+}
+
+
+def resolve_time_range(time_range: Union[TimeRange, str]) -> TimeRange:
+    """Map a time-range label to its TimeRange, defaulting to 24 hours for unknown labels."""
+    if isinstance(time_range, TimeRange):
+        return time_range
+    return _TIME_RANGES_BY_LABEL.get(time_range, TimeRange.DAY)
+
+
+# Score added for a credible source and for news under an hour old
+_RANKING_BOOST_WEIGHTS = np.array([1.0, 0.5])
+# Credible outlets; "ap" must be a whole word so sources like "Apple Newsroom" do not match
+_TRUSTED_SOURCE_RE = re.compile(r'reuters|bloomberg|cnbc|\bap\b|wsj', re.IGNORECASE)
+
+# Near-duplicate titles: character shingles compared by MinHash LSH
+_TITLE_SHINGLE_SIZE = 5
+_TITLE_NUM_PERM = 128
+_TITLE_DUP_THRESHOLD = 0.85
+_TITLE_WORD_DELTA = 5  # titles whose word counts differ by more than this are never duplicates
+
+# How long a query's NER waits for concurrent queries to share its spaCy batch
+_NER_BATCH_WAIT = 0.02  # seconds
+
+
+# Query parameters that only track the click and never select a different article
+_TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid', '_ga', 'ref_src'
+})
+
+
+def _normalize_url(url: str) -> str:
+    """Drop tracking parameters and the fragment, and sort the rest of the query, so variants of a link compare equal."""
+    parsed = urlparse(url)
+    if not parsed.netloc:
+        return url
+    
+    params = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in _TRACKING_PARAMS
+    )
+    query = f"?{urlencode(params)}" if params else ''
+    return f"{parsed.netloc.lower()}{parsed.path.rstrip('/')}{query}"
+
+
+@lru_cache(maxsize=4096)
+def _epoch_seconds(timestamp_str: str) -> float:
+    """POSIX time of an ISO timestamp, or NaN when it is missing or unparseable."""
+    try:
+        if parse_datetime is not None:
+            return parse_datetime(timestamp_str).timestamp()  # C parser, handles 'Z' itself
+        return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return np.nan
+
+
+def _is_well_formed(item: Dict) -> bool:
+    """Content quality and URL checks for a news item."""
+    try:
+        title = item.get('title', '')
+        url = item.get('url', '')
+        return len(title) >= 10 and 'error' not in title.lower() and bool(url) and url.startswith('http')
+    except Exception:
+        return False
+
+
+def _title_minhash(title: str) -> MinHash:
+    """MinHash signature of a title's lowercased character shingles."""
+    size = _TITLE_SHINGLE_SIZE
+    shingles = {title[i:i + size] for i in range(len(title) - size + 1)} or {title}
+    
+    minhash = MinHash(num_perm=_TITLE_NUM_PERM)
+    minhash.update_batch([shingle.encode() for shingle in shingles])
+    return minhash
+
+
+async def _gather_within(sources: Dict[str, Any], timeout: float) -> List[Any]:
+    """Await source coroutines concurrently for at most ``timeout`` seconds and return what finished.
+    
+    Sources still running at the deadline are cancelled and reported; failed ones are skipped.
+    """
+    tasks = {asyncio.ensure_future(coro): name for name, coro in sources.items()}
+    if not tasks:
+        return []
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    
+    for task in pending:
+        task.cancel()
+        print(f"⏱️ {tasks[task]} timed out after {timeout}s; continuing without it")
+    
+    results = []
+    for task in tasks:  # keep source order
+        if task in done and not task.cancelled() and task.exception() is None:
+            results.append(task.result())
+    return results
+
+
+class _DisjointSet:
+    """Union-find with union by rank and path halving."""
+    
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+    
+    def find(self, i: int) -> int:
+        """Root of the set containing ``i``."""
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    def union(self, i: int, j: int):
+        """Merge the sets containing ``i`` and ``j``."""
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return
+        if self.rank[root_i] < self.rank[root_j]:
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        if self.rank[root_i] == self.rank[root_j]:
+            self.rank[root_i] += 1
 
 
 class NewsAggregator:
@@ -21,21 +181,42 @@ class NewsAggregator:
             RSSCrawler()
         ]
         self.extractor = NewsExtractor()
-        self.cache = {}
+        # "company|hours" -> aggregated results, so repeat queries skip the crawl
+        self.cache = TTLCache(maxsize=config.cache.news_cache_size, ttl=config.cache.news_cache_ttl)
+        self._inflight: Dict[str, asyncio.Task] = {}
     
     async def fetch_all_news(self, company: str, time_range_hours: int = 24) -> List[Dict]:
-        """Fetch news from all sources."""
+        """Fetch news from all sources, reusing the results of an identical recent query."""
+        key = f"{company.lower()}|{time_range_hours}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            return list(cached)
+        
+        # Concurrent identical queries share one crawl
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._crawl_all_news(company, time_range_hours))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        results = await asyncio.shield(task)
+        
+        # Empty results usually mean every crawler failed; don't pin that for the whole TTL
+        if results:
+            self.cache[key] = results
+        return list(results)
+    
+    async def _crawl_all_news(self, company: str, time_range_hours: int) -> List[Dict]:
+        """Crawl, deduplicate, time-filter and rank news from all sources."""
         print(f"🔍 Fetching news for: {company}")
         
         all_results = []
         
-        # Run crawlers concurrently
-        tasks = []
-        for crawler in self.crawlers:
-            tasks.append(crawler.fetch(company))
+        # Run crawlers concurrently; one stalled source can't hold up the rest past the crawler timeout
+        sources = {type(crawler).__name__: crawler.fetch(company) for crawler in self.crawlers}
         
         try:
-            crawler_results = await asyncio.gather(*tasks, return_exceptions=True)
+            crawler_results = await _gather_within(sources, config.crawler.timeout)
             
             for results in crawler_results:
                 if isinstance(results, list):
@@ -44,59 +225,74 @@ class NewsAggregator:
         except Exception as e:
             print(f"❌ Crawling error: {e}")
         
-        # Deduplicate by URL and title similarity
-        unique_results = self._deduplicate(all_results)
-        
-        # Filter by time range
+        # Time-filter and deduplicate by URL and title similarity in one pass over the results
         cutoff_time = datetime.now() - timedelta(hours=time_range_hours)
-        filtered_results = self._filter_by_time(unique_results, cutoff_time)
-        
-        # Sort by impact score and recency
-        sorted_results = sorted(filtered_results,
-                              key=lambda x: (x['impact_score'], x['timestamp']),
-                              reverse=True)
+        unique_results = self._deduplicate(all_results, cutoff_time)
         
-        return sorted_results[:10]  # Return top 10 results
+        # Top 10 by impact score and recency, without sorting the rest
+        return heapq.nlargest(10, unique_results, key=lambda x: (x['impact_score'], x['timestamp']))
     
-    def _deduplicate(self, results: List[Dict]) -> List[Dict]:
-        """Remove duplicate articles."""
+    def _deduplicate(self, results: List[Dict], cutoff_time: Optional[datetime] = None) -> List[Dict]:
+        """Remove duplicate articles, keeping the highest-impact copy of each near-duplicate title.
+        
+        If ``cutoff_time`` is given, articles older than it are dropped in the same pass, before hashing.
+        """
+        cutoff = cutoff_time.timestamp() if cutoff_time is not None else None
+        
+        # Stage 1: time window, then exact URL and title matches; titles are keyed by a 128-bit digest
         seen_urls = set()
-        seen_titles = set()
-        unique_results = []
+        survivors = {}  # title digest -> (normalized title, highest-impact result)
         
         for result in results:
-            url = result.get('url', '')
-            title = result.get('title', '').lower()
+            if cutoff is not None and _epoch_seconds(result.get('timestamp', '')) < cutoff:
+                continue
             
-            # Simple deduplication by URL and similar titles
-            if url not in seen_urls and title not in seen_titles:
-                seen_urls.add(url)
-                seen_titles.add(title)
-                unique_results.append(result)
+            url = _normalize_url(result.get('url', ''))
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+            
+            title = result.get('title', '').lower().strip()
+            digest = hashlib.blake2b(title.encode(), digest_size=16).digest()
+            kept = survivors.get(digest)
+            if kept is None or result.get('impact_score', 0) > kept[1].get('impact_score', 0):
+                survivors[digest] = (title, result)
+        
+        # Stage 2: near-duplicate titles among the survivors, merged into connected components
+        entries = list(survivors.values())
+        word_counts = [len(title.split()) for title, _ in entries]
+        components = _DisjointSet(len(entries))
+        lsh = MinHashLSH(threshold=_TITLE_DUP_THRESHOLD, num_perm=_TITLE_NUM_PERM)
+        word_buckets = set()  # word counts of indexed titles
         
-        return unique_results
+        for idx, (title, _) in enumerate(entries):
+            words = word_counts[idx]
+            minhash = _title_minhash(title)
+            
+            # Only query LSH when some indexed title has a comparable length, and drop length-mismatched candidates
+            if any(words + delta in word_buckets for delta in range(-_TITLE_WORD_DELTA, _TITLE_WORD_DELTA + 1)):
+                for other in lsh.query(minhash):
+                    if abs(word_counts[other] - words) <= _TITLE_WORD_DELTA:
+                        components.union(idx, other)
+            
+            lsh.insert(idx, minhash)
+            word_buckets.add(words)
+        
+        # One article per component, the highest-impact one, in order of the component's first appearance
+        best = {}
+        for idx, (_, result) in enumerate(entries):
+            root = components.find(idx)
+            if root not in best or result.get('impact_score', 0) > best[root].get('impact_score', 0):
+                best[root] = result
+        
+        return list(best.values())
     
     def _filter_by_time(self, results: List[Dict], cutoff_time: datetime) -> List[Dict]:
         """Filter results by time range."""
-        filtered = []
-        for result in results:
-            try:
-                timestamp_str = result.get('timestamp', '')
-                if timestamp_str:
-                    # Handle different timestamp formats
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                    except:
-                        timestamp = datetime.now()  # Default to now if parsing fails
-                    
-                    if timestamp >= cutoff_time:
-                        filtered.append(result)
-                else:
-                    filtered.append(result)  # Include if no timestamp
-            except:
-                filtered.append(result)  # Include if parsing fails
-        
-        return filtered
+        cutoff = cutoff_time.timestamp()
+        
+        # Missing or unparseable timestamps parse to NaN, which never compares below the cutoff, so they are kept
+        return [result for result in results if not _epoch_seconds(result.get('timestamp', '')) < cutoff]
 
 
 class NewsPipeline:
@@ -104,18 +300,21 @@ class NewsPipeline:
     
     def __init__(self):
         self.aggregator = NewsAggregator()
-        self.response_generator = ResponseGenerator(
-            model_manager.model, 
-            model_manager.tokenizer
-        )
+        self._response_generator = None  # built on first use, once the models are loaded
     
-    async def process_news_query(self, company: str, style: str, time_range: str, impact_threshold: float) -> str:
+    @property
+    def response_generator(self) -> ResponseGenerator:
+        """Summary generator bound to the current model; callers wait for model loading off the event loop first."""
+        if self._response_generator is None or self._response_generator.model is not model_manager.model:
+            self._response_generator = ResponseGenerator(model_manager.model, model_manager.tokenizer)
+        return self._response_generator
+    
+    async def process_news_query(self, company: str, style: str, time_range: Union[TimeRange, str], impact_threshold: float) -> str:
         """Main pipeline to process news query."""
         
         try:
             # Convert time range to hours
-            time_mapping = {"1 hour": 1, "6 hours": 6, "24 hours": 24}
-            hours = time_mapping.get(time_range, 24)
+            hours = int(resolve_time_range(time_range))
             
             print(f"🚀 Processing query for {company}...")
             
@@ -132,8 +331,10 @@ class NewsPipeline:
                 return f"📊 Found {len(news_items)} news items for '{company}', but none meet your impact threshold of {impact_threshold}/10. Try lowering the threshold."
             
             print(f"✅ Found {len(filtered_news)} relevant news items")
+            annotate_news_items(filtered_news)
             
-            # Step 3: Generate styled summary
+            # Step 3: Generate styled summary, once a background model load (if any) has finished
+            await asyncio.to_thread(model_manager.wait_ready)
             summary = self.response_generator.generate_summary(filtered_news, style, company)
             
             return summary
@@ -150,40 +351,51 @@ class EnterpriseNewsPipeline:
     def __init__(self):
         self.advanced_crawler = AdvancedNewsCrawler()
         self.rss_crawler = RSSCrawler()
-        self.conversational_ai = ConversationalAI()
-        self.session_data = {}
+        self._conversational_ai = None  # built on first use
+        # session id -> last query's results; bounded so a long-running server doesn't keep every session
+        self.session_data = LRUCache(maxsize=config.server.max_sessions)
+        self._pending_ner: List[tuple] = []  # (user input, future) awaiting the next spaCy batch
+        # One spaCy Language must not run in two threads, so overlapping flushes queue up here
+        self._ner_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ner")
+    
+    @property
+    def conversational_ai(self) -> ConversationalAI:
+        """Conversational AI, created on first use."""
+        if self._conversational_ai is None:
+            self._conversational_ai = ConversationalAI()
+        return self._conversational_ai
     
     async def process_enterprise_query(self,
                                      user_input: str,
                                      company: str = None,
                                      style: str = "professional",
-                                     time_range: str = "24 hours",
+                                     time_range: Union[TimeRange, str] = "24 hours",
                                      impact_threshold: float = 5.0,
                                      session_id: str = "default") -> str:
         """Process enterprise-level news query with full context."""
         
-        start_time = time.time()
+        start_time = time.monotonic()
         
         try:
             # Extract company name if not provided
             if not company:
-                company = self._extract_company_from_input(user_input)
+                company = self._extract_company_from_input(user_input, await self._extract_entities_batched(user_input))
             
             if not company:
-                return self.conversational_ai.generate_conversational_response(
+                return await self.conversational_ai.generate_conversational_response(
                     user_input, None, style
                 ) + "\n\n💡 *Tip: Mention a specific company name for detailed news analysis.*"
             
             print(f"🔍 Processing enterprise query for: {company}")
             
             # Multi-source data gathering
-            news_tasks = [
-                self.advanced_crawler.enhanced_duckduckgo_scrape(company, 15),
-                self.rss_crawler.fetch(company)
-            ]
+            news_sources = {
+                'DuckDuckGo': self.advanced_crawler.enhanced_duckduckgo_scrape(company, 15),
+                'RSS': self.rss_crawler.fetch(company)
+            }
             
-            # Parallel execution
-            crawler_results = await asyncio.gather(*news_tasks, return_exceptions=True)
+            # Parallel execution, capped at the crawler timeout
+            crawler_results = await _gather_within(news_sources, config.crawler.timeout)
             
             # Combine and process results
             all_news = []
@@ -196,22 +408,23 @@ class EnterpriseNewsPipeline:
             
             # Advanced filtering and ranking
             filtered_news = self._enterprise_filter_news(all_news, impact_threshold, time_range)
+            annotate_news_items(filtered_news)
             
             # Store session data
             self.session_data[session_id] = {
                 'last_company': company,
                 'last_results': filtered_news,
-                'query_time': datetime.now().isoformat(),
-                'processing_time': time.time() - start_time
+                'query_time': datetime.now(timezone.utc),  # kept a datetime; to_json() serializes it natively
+                'processing_time': time.monotonic() - start_time
             }
             
             # Generate conversational response
-            response = self.conversational_ai.generate_conversational_response(
-                user_input, filtered_news, style
+            response = await self.conversational_ai.generate_conversational_response(
+                user_input, filtered_news, style, company=company
             )
             
             # Add enterprise metadata
-            processing_time = time.time() - start_time
+            processing_time = time.monotonic() - start_time
             response += f"\n\n---\n📊 **Enterprise Analytics**: Processed {len(all_news)} sources in {processing_time:.2f}s | Found {len(filtered_news)} relevant items"
             
             return response
@@ -223,18 +436,57 @@ class EnterpriseNewsPipeline:
             error_response += "Please try again in a moment or contact support if the issue persists."
             return error_response
     
-    def _extract_company_from_input(self, user_input: str) -> str:
-        """Extract company name from user input using NLP."""
+    async def _extract_entities_batched(self, user_input: str) -> Optional[List[Dict]]:
+        """Named entities of a query, run through spaCy together with other queries arriving at the same time.
+        
+        Returns None, so the caller takes the unbatched path, while models are still loading.
+        """
+        if not model_manager.nlp or not model_manager.is_ready():
+            return None
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending_ner.append((user_input, future))
+        
+        # The first query of a batch schedules the flush; later ones just join it
+        if len(self._pending_ner) == 1:
+            loop.call_later(_NER_BATCH_WAIT, self._flush_ner_batch)
+        
+        return await future
+    
+    def _flush_ner_batch(self):
+        """Run every pending query through spaCy in one pipe() call on the NER thread."""
+        batch, self._pending_ner = self._pending_ner, []
+        
+        loop = asyncio.get_running_loop()
+        ner = loop.run_in_executor(self._ner_executor, model_manager.extract_entities_batch, [text for text, _ in batch])
+        ner.add_done_callback(lambda done: self._resolve_ner_batch(batch, done))
+    
+    @staticmethod
+    def _resolve_ner_batch(batch: List[tuple], ner: asyncio.Future):
+        """Hand each waiting query its entities, or None (per-query NER) if the batch failed."""
+        if ner.cancelled() or ner.exception() is not None:
+            results = [None] * len(batch)
+        else:
+            results = ner.result()
+        
+        for (_, future), entities in zip(batch, results):
+            if not future.done():
+                future.set_result(entities)
+    
+    def _extract_company_from_input(self, user_input: str, entities: Optional[List[Dict]] = None) -> str:
+        """Extract company name from user input using NLP, optionally from entities already extracted."""
         try:
             if not model_manager.nlp:
                 return None
             
-            doc = model_manager.nlp(user_input)
+            if entities is None:
+                entities = [{"text": ent.text, "label": ent.label_} for ent in model_manager.nlp(user_input).ents]
             
             # Look for organizations
-            for ent in doc.ents:
-                if ent.label_ in ["ORG", "COMPANY"]:
-                    return ent.text
+            for ent in entities:
+                if ent["label"] in ["ORG", "COMPANY"]:
+                    return ent["text"]
             
             # Common company keywords
             company_indicators = ['stock', 'shares', 'ticker', 'company', 'corp', 'inc', 'ltd']
@@ -250,70 +502,48 @@ class EnterpriseNewsPipeline:
         except Exception as e:
             return None
     
-    def _enterprise_filter_news(self, news_items: List[Dict], impact_threshold: float, time_range: str) -> List[Dict]:
+    def _enterprise_filter_news(self, news_items: List[Dict], impact_threshold: float, time_range: Union[TimeRange, str]) -> List[Dict]:
         """Enterprise-level news filtering with advanced criteria."""
         
         # Time filtering
-        time_mapping = {"1 hour": 1, "6 hours": 6, "24 hours": 24, "1 week": 168}
-        hours = time_mapping.get(time_range, 24)
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        filtered = []
-        
-        for item in news_items:
-            try:
-                # Impact threshold filter
-                if item.get('impact_score', 0) < impact_threshold:
-                    continue
-                
-                # Time filter
-                timestamp_str = item.get('timestamp', '')
-                if timestamp_str:
-                    try:
-                        timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                        if timestamp < cutoff_time:
-                            continue
-                    except:
-                        pass  # Include if timestamp parsing fails
-                
-                # Content quality filter
-                title = item.get('title', '')
-                if len(title) < 10 or 'error' in title.lower():
-                    continue
-                
-                # URL validation
-                url = item.get('url', '')
-                if not url or not url.startswith('http'):
-                    continue
-                
-                filtered.append(item)
-            
-            except Exception as e:
-                continue
+        hours = int(resolve_time_range(time_range))
+        now = time.time()
+        count = len(news_items)
         
-        # Advanced ranking algorithm
-        for item in filtered:
-            # Boost score based on source credibility
-            source = item.get('source', '').lower()
-            if any(trusted in source for trusted in ['reuters', 'bloomberg', 'cnbc', 'ap', 'wsj']):
-                item['impact_score'] = min(item['impact_score'] + 1.0, 10.0)
-            
-            # Boost recent news
-            try:
-                timestamp = datetime.fromisoformat(item['timestamp'].replace('Z', '+00:00'))
-                hours_old = (datetime.now(timestamp.tzinfo) - timestamp).total_seconds() / 3600
-                if hours_old < 1:  # Less than 1 hour old
-                    item['impact_score'] = min(item['impact_score'] + 0.5, 10.0)
-            except:
-                pass
-        
-        # Sort by impact score and return top items
-        return sorted(filtered, key=lambda x: x['impact_score'], reverse=True)[:12]
+        # Per-item columns, each parsed once; unparseable timestamps are NaN, which passes the time filter
+        impacts = np.array([item.get('impact_score', 0) for item in news_items], dtype=np.float64)
+        timestamps = np.array([_epoch_seconds(item.get('timestamp', '')) for item in news_items], dtype=np.float64)
+        well_formed = np.fromiter(map(_is_well_formed, news_items), dtype=bool, count=count)
+        trusted = np.fromiter(
+            (_TRUSTED_SOURCE_RE.search(str(item.get('source', ''))) is not None for item in news_items),
+            dtype=bool, count=count
+        )
+        
+        # Impact threshold, time window and content/URL quality as one mask
+        keep = (impacts >= impact_threshold) & ~(timestamps < now - hours * 3600) & well_formed
+        
+        # Advanced ranking: credible-source and under-an-hour boosts, scored in one kernel call
+        boosts = np.column_stack([trusted, now - timestamps < 3600]).astype(np.float64)[keep]
+        scores = score_items(impacts[keep], boosts, _RANKING_BOOST_WEIGHTS)
+        
+        filtered = [item for item, kept in zip(news_items, keep.tolist()) if kept]
+        for item, score in zip(filtered, scores.tolist()):
+            item['impact_score'] = score
+        
+        # Top items by boosted score, selected without a full sort
+        return [filtered[i] for i in top_k_indices(scores, 12)]
     
     def get_session_data(self, session_id: str) -> Dict:
         """Get session data for analytics."""
         return self.session_data.get(session_id, {})
     
+    def to_json(self, session_id: str) -> bytes:
+        """Serialize a session's data (last company, results, timings) to UTF-8 JSON."""
+        data = self.get_session_data(session_id)
+        if orjson is not None:
+            return orjson.dumps(data, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(data, default=lambda obj: obj.isoformat() if hasattr(obj, 'isoformat') else str(obj)).encode()
+    
     def clear_session_data(self, session_id: str):
         """Clear session data."""
         if session_id in self.session_data:
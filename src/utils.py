@@ -2,28 +2,53 @@
 Utilities module with helper functions and logging setup.
 """
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import re
 import sys
+import numpy as np
 from typing import Dict, Any
 from .config import config
 
+# Substring match, like the original keyword loop, so plurals such as "lawsuits" still count
+_HIGH_IMPACT_RE = re.compile(
+    r'breaking|exclusive|urgent|critical|major|acquisition|merger|bankruptcy|lawsuit|scandal|'
+    r'ceo|resignation|fired|investigation',
+    re.IGNORECASE
+)
+
+# Writes log records to the file and stdout from a background thread; started once by setup_logging
+_log_listener = None
+
 
 def setup_logging(level: str = "INFO") -> logging.Logger:
     """Setup logging configuration."""
     
+    global _log_listener
+    
     # Create logs directory if it doesn't exist
     os.makedirs("logs", exist_ok=True)
     
-    # Configure logging
-    logging.basicConfig(
-        level=getattr(logging, level.upper()),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
+    if _log_listener is None:
+        # Request paths only enqueue records; the listener thread does the file and console writes
+        log_queue = queue.SimpleQueue()
+        _log_listener = logging.handlers.QueueListener(
+            log_queue,
             logging.FileHandler('logs/rap_iq.log'),
             logging.StreamHandler(sys.stdout)
-        ]
-    )
+        )
+        _log_listener.start()
+        atexit.register(_log_listener.stop)
+        
+        # Records are formatted before they are queued, so the listener's handlers write them as-is
+        logging.basicConfig(
+            level=getattr(logging, level.upper()),
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            handlers=[logging.handlers.QueueHandler(log_queue)]
+        )
     
     logger = logging.getLogger('rap_iq')
     logger.info("Logging setup complete")
@@ -55,7 +80,7 @@ def validate_environment() -> Dict[str, Any]:
     # Check required packages
     required_packages = [
         "transformers", "accelerate", "bitsandbytes", "gradio", 
-        "beautifulsoup4", "requests", "feedparser", "newspaper3k",
+        "beautifulsoup4", "requests", "feedparser", "trafilatura",
         "spacy", "sentence_transformers", "aiohttp", "nest_asyncio"
     ]
     
@@ -221,20 +246,22 @@ def extract_domain_from_url(url: str) -> str:
 
 def is_high_impact_news(title: str, snippet: str = "") -> bool:
     """Check if news is high impact based on keywords."""
+    return _HIGH_IMPACT_RE.search(title) is not None or _HIGH_IMPACT_RE.search(snippet) is not None
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first, ties in index order; selects in O(n) and sorts only the top."""
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    
+    if len(scores) > k:
+        # Everything scoring at least the k-th best, so ties at the cutoff go to the earliest results
+        cutoff = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= cutoff)
+    else:
+        candidates = np.arange(len(scores))
     
-    high_impact_keywords = [
-        'breaking', 'exclusive', 'urgent', 'critical', 'major',
-        'acquisition', 'merger', 'bankruptcy', 'lawsuit', 'scandal',
-        'ceo', 'resignation', 'fired', 'investigation'
-    ]
-    
-    text = f"{title} {snippet}".lower()
-    
-    for keyword in high_impact_keywords:
-        if keyword in text:
-            return True
-    
-    return False
+    return candidates[np.argsort(-scores[candidates], kind='stable')][:k]
 
 
 def format_impact_score(score: float) -> str:
@@ -4,9 +4,12 @@ Test module for the news pipeline functionality.
 
 import pytest
 import asyncio
+import numpy as np
+import torch
 from unittest.mock import Mock, patch
 from src.pipeline import NewsPipeline, EnterpriseNewsPipeline
 from src.crawlers import DuckDuckGoCrawler, RSSCrawler
+from src.ai import SemanticResponseCache
 
 
 class TestNewsPipeline:
@@ -81,6 +84,31 @@ class TestNewsPipeline:
             assert "none meet your impact threshold" in result
 
 
+    def test_deduplicate_near_duplicate_titles(self, pipeline):
+        """Near-identical titles and tracking-parameter URLs collapse; distinct query-string articles are kept."""
+        results = [
+            {'title': 'Tesla announces Q3 earnings', 'url': 'http://a.com/1', 'impact_score': 6.0},
+            {'title': 'Tesla announces Q3 earnings.', 'url': 'http://b.com/2', 'impact_score': 8.0},
+            {'title': 'Apple unveils new iPhone lineup', 'url': 'http://a.com/3?utm_source=x', 'impact_score': 5.0},
+            {'title': 'Something else entirely', 'url': 'http://a.com/3', 'impact_score': 9.0},
+            {'title': 'Microsoft opens new campus', 'url': 'http://a.com/article.php?id=1', 'impact_score': 5.0},
+            {'title': 'Amazon expands grocery delivery', 'url': 'http://a.com/article.php?id=2', 'impact_score': 5.0},
+            {'title': 'Google ships new Pixel phones', 'url': '//duckduckgo.com/l/?uddg=https%3A%2F%2Fx.com%2Fa', 'impact_score': 5.0},
+            {'title': 'Nvidia reports record revenue', 'url': '//duckduckgo.com/l/?uddg=https%3A%2F%2Fy.com%2Fb', 'impact_score': 5.0}
+        ]
+        
+        unique = pipeline.aggregator._deduplicate(results)
+        
+        assert [r['url'] for r in unique] == [
+            'http://b.com/2',
+            'http://a.com/3?utm_source=x',
+            'http://a.com/article.php?id=1',
+            'http://a.com/article.php?id=2',
+            '//duckduckgo.com/l/?uddg=https%3A%2F%2Fx.com%2Fa',
+            '//duckduckgo.com/l/?uddg=https%3A%2F%2Fy.com%2Fb'
+        ]
+
+
 class TestEnterpriseNewsPipeline:
     """Test cases for the enterprise news pipeline."""
     
@@ -133,6 +161,53 @@ class TestEnterpriseNewsPipeline:
             result = enterprise_pipeline._extract_company_from_input("Tell me about Apple's latest news")
             assert result == "Apple"
     
+    @pytest.mark.asyncio
+    async def test_overlapping_ner_batches_run_one_at_a_time(self, enterprise_pipeline):
+        """Test that a second NER batch waits for the first instead of sharing spaCy across threads."""
+        import threading
+        import time
+        
+        running, overlaps = [0], []
+        lock = threading.Lock()
+        
+        def extract_entities_batch(texts):
+            with lock:
+                running[0] += 1
+                overlaps.append(running[0])
+            time.sleep(0.1)
+            with lock:
+                running[0] -= 1
+            return [[{"text": text, "label": "ORG"}] for text in texts]
+        
+        with patch('src.pipeline.model_manager') as mock_model_manager:
+            mock_model_manager.is_ready.return_value = True
+            mock_model_manager.extract_entities_batch.side_effect = extract_entities_batch
+            
+            first = asyncio.ensure_future(enterprise_pipeline._extract_entities_batched("Tesla"))
+            await asyncio.sleep(0.05)  # the first batch is now running
+            second = await enterprise_pipeline._extract_entities_batched("Apple")
+            
+            assert (await first)[0]["text"] == "Tesla"
+            assert second[0]["text"] == "Apple"
+            assert max(overlaps) == 1
+    
+    def test_session_export_serializes_datetimes(self, enterprise_pipeline):
+        """Test that session data keeps datetimes as objects and exports them as ISO strings."""
+        import json
+        from datetime import datetime, timezone
+        
+        query_time = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+        enterprise_pipeline.session_data["session_a"] = {
+            'last_company': "Tesla",
+            'last_results': [],
+            'query_time': query_time,
+            'processing_time': 0.5
+        }
+        
+        exported = json.loads(enterprise_pipeline.to_json("session_a"))
+        assert datetime.fromisoformat(exported['query_time']) == query_time
+        assert exported['last_company'] == "Tesla"
+    
     def test_enterprise_filter_news(self, enterprise_pipeline):
         """Test enterprise news filtering."""
         test_news = [
@@ -193,16 +268,267 @@ class TestCrawlers:
     @pytest.mark.asyncio
     async def test_duckduckgo_fetch_error_handling(self, duckduckgo_crawler):
         """Test DuckDuckGo crawler error handling."""
-        with patch.object(duckduckgo_crawler.session, 'get', side_effect=Exception("Network error")):
+        with patch.object(duckduckgo_crawler, '_fetch', side_effect=Exception("Network error")):
             result = await duckduckgo_crawler.fetch("Tesla")
             assert result == []
     
     @pytest.mark.asyncio
     async def test_rss_fetch_error_handling(self, rss_crawler):
         """Test RSS crawler error handling."""
-        with patch('src.crawlers.feedparser.parse', side_effect=Exception("RSS error")):
-            result = await rss_crawler.fetch("Tesla")
-            assert result == []
+        # Parse in the default thread pool so the patch applies
+        with patch('src.crawlers.get_parse_pool', return_value=None):
+            with patch.object(rss_crawler, '_fetch', return_value=b"<rss></rss>"):
+                with patch('src.feedparse_worker.feedparser.parse', side_effect=Exception("RSS error")) as mock_parse:
+                    result = await rss_crawler.fetch("Tesla")
+                    assert result == []
+                    assert mock_parse.called
+    
+    def test_session_closed_with_its_event_loop(self):
+        """Test that each event loop gets its own crawler session, closed when that loop shuts down."""
+        from src.crawlers import get_session
+        
+        async def use_session():
+            session = get_session()
+            assert get_session() is session
+            return session
+        
+        first = asyncio.run(use_session())
+        second = asyncio.run(use_session())
+        
+        assert first is not second
+        assert first.closed and second.closed
+
+
+class TestSemanticResponseCache:
+    """Test cases for the semantic response cache."""
+    
+    @pytest.fixture
+    def news(self):
+        """Create a small news batch."""
+        return [
+            {'title': 'Tesla News', 'url': 'http://example.com/tesla', 'impact_score': 7.0},
+            {'title': 'More Tesla News', 'url': 'http://example.com/tesla-2', 'impact_score': 6.0}
+        ]
+    
+    @pytest.fixture
+    def cache(self):
+        """Create a cache with a deterministic fake embedder."""
+        cache = SemanticResponseCache(threshold=0.9, max_entries=2)
+        vectors = {
+            "what's the latest on tesla?": [1.0, 0.0],
+            "what is the latest on tesla?": [0.98, 0.199],
+            "how is apple doing?": [0.0, 1.0]
+        }
+        cache._embed = lambda text: np.array(vectors.get(text, [0.6, 0.8]), dtype=np.float32)
+        return cache
+    
+    def test_exact_and_semantic_hits(self, cache, news):
+        """Test that normalized and semantically similar queries hit."""
+        cache.put("What's the latest on Tesla?", "Tesla", "professional", news, "Cached response")
+        
+        assert cache.get("  what's the LATEST on tesla? ", "Tesla", "professional", news) == "Cached response"
+        assert cache.get("What is the latest on Tesla?", "Tesla", "professional", news) == "Cached response"
+        assert cache.get("How is Apple doing?", "Tesla", "professional", news) is None
+    
+    def test_miss_on_different_news_or_style(self, cache, news):
+        """Test that responses are not reused for different news or styles."""
+        cache.put("What's the latest on Tesla?", "Tesla", "professional", news, "Cached response")
+        
+        assert cache.get("What's the latest on Tesla?", "Tesla", "casual", news) is None
+        assert cache.get("What's the latest on Tesla?", "Tesla", "professional", news[:1]) is None
+    
+    def test_miss_on_different_conversation_history(self, cache, news):
+        """Test that a follow-up with prior exchanges doesn't get the first-turn answer."""
+        history = [{'user': "What's the latest on Tesla?", 'assistant': "First-turn answer"}]
+        cache.put("What's the latest on Tesla?", "Tesla", "professional", news, "First-turn answer")
+        
+        assert cache.get("What's the latest on Tesla?", "Tesla", "professional", news, history) is None
+        
+        cache.put("What's the latest on Tesla?", "Tesla", "professional", news, "Follow-up answer", history)
+        assert cache.get("What is the latest on Tesla?", "Tesla", "professional", news, history) == "Follow-up answer"
+    
+    def test_lru_eviction(self, cache, news):
+        """Test that the least recently used entry is evicted."""
+        cache.put("What's the latest on Tesla?", "Tesla", "professional", news, "First")
+        cache.put("How is Apple doing?", "Tesla", "professional", news, "Second")
+        cache.get("What's the latest on Tesla?", "Tesla", "professional", news)
+        cache.put("Something else", "Tesla", "professional", news, "Third")
+        
+        assert cache.get("How is Apple doing?", "Tesla", "professional", news) is None
+        assert cache.get("What's the latest on Tesla?", "Tesla", "professional", news) == "First"
+    
+    def test_embeddings_missing_during_load_are_not_cached(self, news):
+        """Test that a query embedded before the embedder loaded is re-embedded later."""
+        cache = SemanticResponseCache(threshold=0.9, max_entries=2)
+        with patch('src.ai.model_manager') as mock_model_manager:
+            mock_model_manager.embed_text.return_value = None
+            cache.put("What's the latest on Tesla?", "Tesla", "professional", news, "Cached response")
+            
+            mock_model_manager.embed_text.return_value = np.array([1.0, 0.0], dtype=np.float32)
+            cache.put("What's the latest on Tesla?", "Tesla", "professional", news, "Cached response")
+            
+            assert asyncio.run(cache.get_async("What is the latest on Tesla?", "Tesla", "professional", news)) == "Cached response"
+
+
+class MergingTokenizer:
+    """Character tokenizer that, like BPE, merges a blank line into the character after it."""
+    
+    def encode(self, text):
+        ids, i = [], 0
+        while i < len(text):
+            if text.startswith("\n\n", i) and i + 2 < len(text):
+                ids.append(1000 + ord(text[i + 2]))
+                i += 3
+            else:
+                ids.append(ord(text[i]))
+                i += 1
+        return ids
+    
+    def __call__(self, text, return_tensors=None, max_length=None, truncation=False, **kwargs):
+        ids = self.encode(text)[:max_length] if truncation else self.encode(text)
+        return {'input_ids': torch.tensor([ids]) if return_tensors == 'pt' else ids}
+
+
+class TestPrefixReuse:
+    """Test cases for reusing cached prompt-prefix state."""
+    
+    @pytest.fixture
+    def manager(self):
+        """Create a model manager with a fake model and a boundary-merging tokenizer."""
+        from src.models import ModelManager
+        
+        manager = ModelManager()
+        manager.tokenizer = MergingTokenizer()
+        manager.model = Mock(device=torch.device("cpu"))
+        manager.model.return_value = Mock(past_key_values=("prefix kv",))
+        return manager
+    
+    def test_prefix_state_reused_when_ids_match(self, manager):
+        """Test that the prefix KV state is reused when the full encoding starts with the prefix ids."""
+        prefix = "<s>[INST] System prompt."
+        ids, past_key_values = manager._encode_with_prefix(prefix + "\n\nUser question", prefix)
+        
+        assert ids[0].tolist() == manager.tokenizer.encode(prefix + "\n\nUser question")
+        assert past_key_values == ("prefix kv",)
+    
+    def test_full_prompt_used_when_tokens_merge_across_prefix(self, manager):
+        """Test that a prefix whose last tokens merge with the suffix falls back to the full prompt."""
+        prefix = "<s>[INST] System prompt.\n\n"
+        ids, past_key_values = manager._encode_with_prefix(prefix + "User question", prefix)
+        
+        assert manager.tokenizer.encode(prefix) != manager.tokenizer.encode(prefix + "User question")[:len(prefix)]
+        assert ids[0].tolist() == manager.tokenizer.encode(prefix + "User question")
+        assert past_key_values is None
+
+
+class TestResponseGenerator:
+    """Test cases for summary prompt encoding."""
+    
+    def test_prompt_encoding_cached_per_whole_prompt(self):
+        """Test that a repeated prompt is tokenized once and a changed one is tokenized again."""
+        from src.ai import ResponseGenerator
+        
+        tokenizer = Mock(side_effect=lambda text, **kwargs: {'input_ids': torch.tensor([[len(text)]])})
+        generator = ResponseGenerator(model=Mock(), tokenizer=tokenizer)
+        
+        first = generator._encode_prompt("Company: Tesla\nNews Updates:\n1. Tesla News")
+        again = generator._encode_prompt("Company: Tesla\nNews Updates:\n1. Tesla News")
+        generator._encode_prompt("Company: Tesla\nNews Updates:\n1. Other News")
+        
+        assert again is first
+        assert tokenizer.call_count == 2
+
+
+class TestGradioInterface:
+    """Test cases for the Gradio chat handlers."""
+    
+    @pytest.fixture
+    def gradio_interface(self):
+        """Create an interface whose pipeline echoes the query back."""
+        from src.interface import GradioInterface
+        
+        gradio_interface = GradioInterface()
+        
+        async def echo(user_input, session_id, **kwargs):
+            await asyncio.sleep(0)
+            return f"Answer to {user_input}"
+        
+        gradio_interface.pipeline.process_enterprise_query = echo
+        return gradio_interface
+    
+    @pytest.mark.asyncio
+    async def test_sessions_keep_their_own_log(self, gradio_interface):
+        """Test that concurrent messages from two sessions stay in their own session."""
+        sessions = [{"session_id": "session_a"}, {"session_id": "session_b"}]
+        
+        chats, inputs, analytics = await gradio_interface.handle_user_messages(
+            ["Tesla news?", "Apple news?"], ["", ""], ["professional"] * 2,
+            ["24 hours"] * 2, [5.0, 5.0], sessions
+        )
+        
+        assert sessions[0]["log"] == [("Tesla news?", "Answer to Tesla news?")]
+        assert sessions[1]["log"] == [("Apple news?", "Answer to Apple news?")]
+        assert [a["session_id"] for a in analytics] == ["session_a", "session_b"]
+        assert [m.content for m in chats[1]] == ["Apple news?", "Answer to Apple news?"]
+        assert inputs == ["", ""]
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_sessions_do_not_share_state(self, gradio_interface):
+        """Test that two live sessions get distinct ids and never see each other's turns."""
+        session_a, session_b = gradio_interface._new_session(), gradio_interface._new_session()
+        assert session_a["session_id"] != session_b["session_id"]
+        
+        (chat_a, _, _), (chat_b, _, _) = await asyncio.gather(
+            gradio_interface.handle_user_message("Tesla news?", "", "professional", "24 hours", 5.0, session_a),
+            gradio_interface.handle_user_message("Apple news?", "", "professional", "24 hours", 5.0, session_b)
+        )
+        
+        assert [m.content for m in chat_a] == ["Tesla news?", "Answer to Tesla news?"]
+        assert [m.content for m in chat_b] == ["Apple news?", "Answer to Apple news?"]
+        assert session_a["log"] == [("Tesla news?", "Answer to Tesla news?")]
+        assert session_b["log"] == [("Apple news?", "Answer to Apple news?")]
+    
+    @pytest.mark.asyncio
+    async def test_stream_appends_only_the_reply(self, gradio_interface):
+        """Test that the streamed reply extends the first chunk instead of replacing it."""
+        session = gradio_interface._new_session()
+        chunks = [c async for c in gradio_interface.stream_user_message(
+            "Tesla news?", "", "professional", "24 hours", 5.0, session
+        )]
+        
+        (first, _, _), (final, _, analytics) = chunks
+        assert final[:len(first)] == first
+        assert [m.content for m in final[len(first):]] == ["Answer to Tesla news?"]
+        assert analytics["session_id"] == session["session_id"]
+    
+    def test_create_interface_builds(self, gradio_interface):
+        """Smoke test that the installed Gradio accepts every component argument."""
+        import gradio as gr
+        
+        demo = gradio_interface.create_interface()
+        assert isinstance(demo, gr.Blocks)
+    
+    def test_status_refresh_stops_once_models_are_ready(self, gradio_interface):
+        """Test that the status poll reports loading, then ready, and then deactivates."""
+        with patch('src.interface.model_manager') as mock_model_manager:
+            mock_model_manager.is_ready.return_value = False
+            status, timer = gradio_interface._refresh_status()
+            assert status.startswith("🔄") and timer.active
+            
+            mock_model_manager.is_ready.return_value = True
+            status, timer = gradio_interface._refresh_status()
+            assert status.startswith("✅") and not timer.active
+
+
+class TestPackageExports:
+    """Test cases for the package's lazy exports."""
+    
+    def test_every_export_resolves(self):
+        """Test that each name in src.__all__ can be imported."""
+        import src
+        
+        for name in src.__all__:
+            assert getattr(src, name) is not None
 
 
 # Integration tests